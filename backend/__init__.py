@@ -1,2 +1,7 @@
-from .api import app
+def __getattr__(name: str):
+    # Resolved lazily so importing a submodule does not open the databases.
+    if name == "app":
+        from .api import app
 
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Generic, List, Optional, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class BatchWriter(Generic[T]):
+    """Hand queued items to ``sink`` in batches from a single daemon thread.
+
+    A batch is flushed once it holds ``max_batch`` items or ``max_delay`` seconds
+    after its first item arrived. ``submit`` never blocks or writes on the
+    caller's thread: if the queue is full the item is dropped and counted in
+    ``dropped``.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[T]], None],
+        *,
+        name: str,
+        max_batch: int = 100,
+        max_delay: float = 0.2,
+        max_queue: int = 10_000,
+    ) -> None:
+        self._sink = sink
+        self._name = name
+        self._max_batch = max(1, max_batch)
+        self._max_delay = max(0.0, max_delay)
+        self._queue: queue.Queue[Union[T, _FlushMarker]] = queue.Queue(
+            maxsize=max_queue
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def submit(self, item: T) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped & (dropped - 1) == 0:
+                logger.warning(
+                    "%s queue is full; %d item(s) dropped so far", self._name, dropped
+                )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every item submitted before this call has been written.
+
+        Items submitted afterwards are not waited for, so the call returns even
+        under a steady stream of writes. Returns ``False`` if ``timeout`` expired.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return marker.done.wait(remaining)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                thread.start()
+                self._thread = thread
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+                continue
+            batch = [item]
+            marker: Optional[_FlushMarker] = None
+            deadline = time.monotonic() + self._max_delay
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if isinstance(item, _FlushMarker):
+                    marker = item
+                    break
+                batch.append(item)
+            self._write(batch)
+            if marker is not None:
+                marker.done.set()
+
+    def _write(self, batch: List[T]) -> None:
+        try:
+            self._sink(batch)
+        except Exception:  # pragma: no cover - defensive logging
+            logger.exception("%s failed to write %d item(s)", self._name, len(batch))
@@ -7,6 +7,7 @@ from typing import Iterable, Iterator, List, Sequence
 import numpy as np
 import pandas as pd
 
+from .repository import EMBEDDINGS_SCHEMA_VERSION
 from .scibox_client import get_scibox_client
 from .settings import get_settings
 from .text_utils import normalize_text
@@ -129,6 +130,7 @@ def _store_embeddings(ids: Sequence[int], embeddings: Sequence[Sequence[float]])
             "INSERT INTO faq_embeddings (faq_id, vector, dimension) VALUES (?, ?, ?)",
             rows,
         )
+        connection.execute(f"PRAGMA user_version = {EMBEDDINGS_SCHEMA_VERSION}")
         connection.commit()
 
 
@@ -86,10 +86,10 @@ def _load_templates() -> Tuple[TemplateEntry, ...]:
     rows = fetch_all_templates()
     entries: List[TemplateEntry] = []
     for row in rows:
-        question = (row.get("question") or "").strip()
-        category = (row.get("category") or "").strip()
-        subcategory = (row.get("subcategory") or "").strip()
-        answer = row.get("answer") or ""
+        question = (row.question or "").strip()
+        category = (row.category or "").strip()
+        subcategory = (row.subcategory or "").strip()
+        answer = row.answer or ""
         if not question or not category or not subcategory:
             continue
         normalized = normalize_text(question)
@@ -97,7 +97,7 @@ def _load_templates() -> Tuple[TemplateEntry, ...]:
             continue
         entries.append(
             TemplateEntry(
-                id=int(row["id"]),
+                id=row.id,
                 question=question,
                 normalized_question=normalized,
                 category=category,
@@ -202,6 +202,7 @@ def _encode_query(text: str) -> Tuple[np.ndarray, str]:
 
 def _match_template(
     text: str,
+    query_vector: Optional[np.ndarray] = None,
 ) -> Tuple[
     Optional[TemplateEntry],
     float,
@@ -216,11 +217,16 @@ def _match_template(
         logger.warning("Template cache unavailable: %s", exc)
         return None, 0.0, 0.0, 1.0, [], normalize_text(text)
 
-    try:
-        query_vector, normalized_query = _encode_query(text)
-    except RuntimeError as exc:
-        logger.warning("Failed to encode query: %s", exc)
-        return None, 0.0, 0.0, 1.0, [], normalize_text(text)
+    if query_vector is not None:
+        normalized_query = normalize_text(text)
+        if not normalized_query:
+            return None, 0.0, 0.0, 1.0, [], normalized_query
+    else:
+        try:
+            query_vector, normalized_query = _encode_query(text)
+        except RuntimeError as exc:
+            logger.warning("Failed to encode query: %s", exc)
+            return None, 0.0, 0.0, 1.0, [], normalize_text(text)
 
     if matrix.size == 0:
         return None, 0.0, 0.0, 1.0, [], normalized_query
@@ -325,7 +331,7 @@ def _extract_entities(text: str) -> Dict[str, str]:
 
 # -- Основная точка входа ---------------------------------------------------
 
-def classify_and_ner(text: str) -> Dict[str, Any]:
+def classify_and_ner(text: str, *, query_vector: Optional[np.ndarray] = None) -> Dict[str, Any]:
     if not text or not text.strip():
         raise ValueError("Text for classification must be a non-empty string.")
 
@@ -339,7 +345,7 @@ def classify_and_ner(text: str) -> Dict[str, Any]:
         best_weight,
         top_matches,
         normalized_query,
-    ) = _match_template(cleaned_text)
+    ) = _match_template(cleaned_text, query_vector)
     confidence = max(weighted_score, 0.0)
     below_threshold = raw_score < SIMILARITY_THRESHOLD
 
@@ -12,6 +12,7 @@ from .repository import (
     fetch_records_by_ids,
 )
 from .scibox_client import get_scibox_client
+from .settings import get_settings
 from .text_utils import normalize_text
 
 FINALIZE_PROMPT = (
@@ -21,11 +22,60 @@ FINALIZE_PROMPT = (
 )
 
 
+def _quantize_embeddings(
+    matrix: np.ndarray,
+    precision: str,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Подготовить матрицу эмбеддингов к поиску в заданной точности.
+
+    int8 хранится с масштабом на строку и занимает в 4 раза меньше памяти.
+    float16 лишь округляет векторы при загрузке: NumPy переводит float16 во
+    float32 поэлементно, поэтому матрица остаётся float32 и поиск не замедляется.
+    """
+    if precision == "float16":
+        return matrix.astype(np.float16).astype(np.float32), None
+    if precision == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    return matrix, None
+
+
 @lru_cache
-def _load_embeddings() -> Tuple[np.ndarray, Dict[int, int]]:
+def _load_embeddings() -> Tuple[np.ndarray, Optional[np.ndarray], Dict[int, int]]:
     ids, matrix = fetch_all_embeddings()
+    matrix, scales = _quantize_embeddings(matrix, get_settings().embedding_precision)
     index = {faq_id: idx for idx, faq_id in enumerate(ids)}
-    return matrix, index
+    return matrix, scales, index
+
+
+# Строки int8 переводятся во float32 блоками: буфер блока остаётся в кэше
+# процессора, и полная float32-копия кандидатов на каждый запрос не создаётся.
+_SCORE_BLOCK_ROWS = 256
+
+
+def _score_rows(
+    matrix: np.ndarray,
+    row_scales: Optional[np.ndarray],
+    rows: np.ndarray,
+    query_vector: np.ndarray,
+) -> np.ndarray:
+    """Скалярные произведения запроса со строками ``rows`` матрицы эмбеддингов."""
+    if matrix.dtype == np.float32:
+        return matrix[rows] @ query_vector
+    query_vector = query_vector.astype(np.float32, copy=False)
+    scores = np.empty(len(rows), dtype=np.float32)
+    block_shape = (min(_SCORE_BLOCK_ROWS, len(rows)), matrix.shape[1])
+    block = np.empty(block_shape, dtype=np.float32)
+    for start in range(0, len(rows), _SCORE_BLOCK_ROWS):
+        chunk = rows[start : start + _SCORE_BLOCK_ROWS]
+        buffer = block[: len(chunk)]
+        buffer[...] = matrix[chunk]
+        np.matmul(buffer, query_vector, out=scores[start : start + len(chunk)])
+    if row_scales is not None:
+        scores *= row_scales[rows]
+    return scores
 
 
 def preload_embeddings() -> None:
@@ -53,6 +103,11 @@ def _vectorize_query(text: str) -> np.ndarray:
     return vector if norm == 0 else vector / norm
 
 
+def embed_query(text: str) -> np.ndarray:
+    """Вернуть нормированный эмбеддинг запроса в том виде, в каком его ищет semantic_search."""
+    return _vectorize_query(text.strip())
+
+
 def _boost_by_products(
     scores: np.ndarray,
     candidate_ids: Sequence[int],
@@ -71,8 +126,8 @@ def _boost_by_products(
         record = records_map.get(record_id)
         if not record:
             continue
-        question_text = (record.get("question") or "").casefold()
-        answer_text = (record.get("answer") or "").casefold()
+        question_text = (record.question or "").casefold()
+        answer_text = (record.answer or "").casefold()
         boost = 0.0
         for product in products_lower:
             if product in question_text:
@@ -90,13 +145,15 @@ def semantic_search(
     subcategory: Optional[str] = None,
     products: Optional[Sequence[str]] = None,
     top_k: int = 3,
+    query_vector: Optional[np.ndarray] = None,
 ) -> List[Dict[str, Any]]:
     cleaned_query = query.strip()
     if not cleaned_query:
         return []
 
-    query_vector = _vectorize_query(cleaned_query)
-    embedding_matrix, index_map = _load_embeddings()
+    if query_vector is None:
+        query_vector = _vectorize_query(cleaned_query)
+    embedding_matrix, row_scales, index_map = _load_embeddings()
 
     candidate_ids = (
         fetch_ids_for_segment(category, subcategory)
@@ -114,8 +171,7 @@ def semantic_search(
         [index_map[candidate_id] for candidate_id in filtered_ids],
         dtype=int,
     )
-    candidate_vectors = embedding_matrix[candidate_indices]
-    scores = candidate_vectors @ query_vector
+    scores = _score_rows(embedding_matrix, row_scales, candidate_indices, query_vector)
     scores = _boost_by_products(scores, filtered_ids, products or [])
 
     top_indices = np.argsort(-scores)[:top_k]
@@ -128,7 +184,7 @@ def semantic_search(
         record = records.get(record_id)
         if not record:
             continue
-        enriched = dict(record)
+        enriched: Dict[str, Any] = record._asdict()
         enriched["score"] = id_to_score.get(record_id, 0.0)
         results.append(enriched)
     return results
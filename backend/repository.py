@@ -3,23 +3,69 @@ from __future__ import annotations
 import sqlite3
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 import numpy as np
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 DB_PATH = DATA_DIR / "faq.db"
 
+# Значение PRAGMA user_version, начиная с которого векторы в faq_embeddings
+# сохраняются уже L2-нормированными (см. build_index._store_embeddings).
+EMBEDDINGS_SCHEMA_VERSION = 1
+
 
 def _get_connection() -> sqlite3.Connection:
-    """Создать новое соединение с базой FAQ."""
+    """Создать новое соединение с базой FAQ только для чтения.
+
+    Запись выполняет build_index.py через собственное соединение, поэтому здесь
+    база открывается в режиме ``mode=ro`` без неявных транзакций.
+    """
     if not DB_PATH.exists():
         raise FileNotFoundError("База знаний FAQ не найдена. Запустите build_index.py.")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(
+        f"{DB_PATH.as_uri()}?mode=ro",
+        uri=True,
+        isolation_level=None,
+    )
     conn.row_factory = sqlite3.Row
     return conn
 
 
+class FaqRecord(NamedTuple):
+    """Запись FAQ в порядке столбцов выборки fetch_records_by_ids."""
+
+    id: int
+    category: str
+    subcategory: str
+    audience: Optional[str]
+    question: str
+    answer: str
+
+
+class TemplateRow(NamedTuple):
+    """Шаблонный вопрос в порядке столбцов выборки fetch_all_templates."""
+
+    id: int
+    question: str
+    answer: str
+    category: str
+    subcategory: str
+
+
+def _embeddings_normalized(conn: sqlite3.Connection) -> bool:
+    """Проверить, что индекс построен с уже нормированными векторами."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    return int(version) >= EMBEDDINGS_SCHEMA_VERSION
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Привести строки матрицы к единичной длине (для индексов старого формата)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
 @lru_cache
 def fetch_categories() -> List[str]:
     """Получить список всех основных категорий."""
@@ -69,7 +115,7 @@ def fetch_all_ids() -> List[int]:
     return [int(row["id"]) for row in rows]
 
 
-def fetch_records_by_ids(ids: Iterable[int]) -> Dict[int, Dict[str, str]]:
+def fetch_records_by_ids(ids: Iterable[int]) -> Dict[int, FaqRecord]:
     """Получить набор записей FAQ по списку идентификаторов."""
     ids = list(ids)
     if not ids:
@@ -82,19 +128,10 @@ def fetch_records_by_ids(ids: Iterable[int]) -> Dict[int, Dict[str, str]]:
     )
 
     with _get_connection() as conn:
+        conn.row_factory = None
         rows = conn.execute(query, ids).fetchall()
 
-    return {
-        int(row["id"]): {
-            "id": int(row["id"]),
-            "category": row["category"],
-            "subcategory": row["subcategory"],
-            "audience": row["audience"],
-            "question": row["question"],
-            "answer": row["answer"],
-        }
-        for row in rows
-    }
+    return {row[0]: FaqRecord._make(row) for row in rows}
 
 
 def fetch_records_for_category(category: str) -> List[Dict[str, str]]:
@@ -123,9 +160,10 @@ def fetch_records_for_category(category: str) -> List[Dict[str, str]]:
     ]
 
 
-def fetch_all_templates() -> List[Dict[str, str]]:
+def fetch_all_templates() -> List[TemplateRow]:
     """Получить все шаблонные вопросы со связанной категорией и подкатегорией."""
     with _get_connection() as conn:
+        conn.row_factory = None
         rows = conn.execute(
             """
             SELECT
@@ -139,16 +177,7 @@ def fetch_all_templates() -> List[Dict[str, str]]:
             """
         ).fetchall()
 
-    return [
-        {
-            "id": int(row["id"]),
-            "question": row["question"],
-            "answer": row["answer"],
-            "category": row["category"],
-            "subcategory": row["subcategory"],
-        }
-        for row in rows
-    ]
+    return list(map(TemplateRow._make, rows))
 
 
 def fetch_template_embeddings(ids: Iterable[int]) -> Dict[int, np.ndarray]:
@@ -165,6 +194,7 @@ def fetch_template_embeddings(ids: Iterable[int]) -> Dict[int, np.ndarray]:
 
     with _get_connection() as conn:
         rows = conn.execute(query, id_list).fetchall()
+        normalized = _embeddings_normalized(conn)
 
     if not rows:
         raise RuntimeError("FAQ embeddings are missing. Please rebuild the index.")
@@ -176,7 +206,11 @@ def fetch_template_embeddings(ids: Iterable[int]) -> Dict[int, np.ndarray]:
         dimension = int(row["dimension"])
         if vector.size != dimension:
             raise RuntimeError(f"Embedding dimension mismatch for faq_id={faq_id}.")
-        result[faq_id] = vector.copy()
+        if not normalized:
+            norm = float(np.linalg.norm(vector))
+            result[faq_id] = vector / norm if norm else vector.copy()
+        else:
+            result[faq_id] = vector.copy()
     return result
 
 
@@ -186,6 +220,7 @@ def fetch_all_embeddings() -> Tuple[List[int], np.ndarray]:
         rows = conn.execute(
             "SELECT faq_id, vector, dimension FROM faq_embeddings ORDER BY faq_id"
         ).fetchall()
+        normalized = _embeddings_normalized(conn)
 
     if not rows:
         raise RuntimeError("FAQ embeddings are missing. Please rebuild the index.")
@@ -202,4 +237,6 @@ def fetch_all_embeddings() -> Tuple[List[int], np.ndarray]:
         vectors.append(vector.copy())
 
     matrix = np.vstack(vectors).astype(np.float32)
+    if not normalized:
+        matrix = _normalize_rows(matrix)
     return ids, matrix
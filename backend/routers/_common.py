@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Optional, Protocol, Tuple
+
+from fastapi import Request
+
+SESSION_HEADER = "X-Session-Id"
+MAX_SESSION_ID_LENGTH = 128
+
+
+class _SessionPayload(Protocol):
+    session_id: Optional[str]
+
+
+def extract_context(
+    request: Request,
+    payload: Optional[_SessionPayload] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(client_ip, user_agent)`` and fill ``payload.session_id`` from headers."""
+    headers = request.headers
+    if payload is not None and not payload.session_id:
+        session_header = headers.get(SESSION_HEADER)
+        if session_header:
+            payload.session_id = session_header[:MAX_SESSION_ID_LENGTH]
+
+    client = request.client
+    client_ip = client.host if client else None
+    return client_ip, headers.get("User-Agent")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any, Dict, List
+
 from fastapi import APIRouter, Request
 
 from ..models import (
@@ -15,25 +17,25 @@ from ..services.logic import (
     handle_chat_message,
     handle_message_feedback,
 )
+from ._common import extract_context
 
 router = APIRouter(tags=["chat"])
 
 
 @router.get("/messages", response_model=ChatHistoryResponse)
-async def get_messages() -> ChatHistoryResponse:
-    return handle_chat_history()
+async def get_messages() -> Dict[str, List[Dict[str, Any]]]:
+    return await handle_chat_history()
 
 
 @router.post("/message", response_model=ChatMessageResponse)
 async def post_message(request: Request, payload: ChatMessageRequest) -> ChatMessageResponse:
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
-    return handle_chat_message(payload, client_ip=client_ip, user_agent=user_agent)
+    client_ip, user_agent = extract_context(request)
+    return await handle_chat_message(payload, client_ip=client_ip, user_agent=user_agent)
 
 
 @router.delete("/messages", response_model=ActionResponse)
 async def clear_messages() -> ActionResponse:
-    return handle_chat_clear()
+    return await handle_chat_clear()
 
 
 @router.post("/messages/{message_id}/feedback", response_model=ActionResponse)
@@ -42,9 +44,8 @@ async def post_message_feedback(
     request: Request,
     payload: MessageFeedbackRequest,
 ) -> ActionResponse:
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
-    return handle_message_feedback(
+    client_ip, user_agent = extract_context(request)
+    return await handle_message_feedback(
         message_id,
         payload,
         client_ip=client_ip,
@@ -4,20 +4,16 @@ from fastapi import APIRouter, Request
 
 from ..models import ClassifyRequest, ClassifyResponse
 from ..services.logic import handle_classify
+from ._common import extract_context
 
 router = APIRouter(tags=["classify"])
 
 
 @router.post("/classify", response_model=ClassifyResponse)
 async def classify_endpoint(payload: ClassifyRequest, request: Request) -> ClassifyResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
+    client_ip, user_agent = extract_context(request, payload)
 
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
-
-    return handle_classify(
+    return await handle_classify(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
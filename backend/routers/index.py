@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import hmac
+
 from fastapi import APIRouter, HTTPException, Request, status
 
 from ..build_index import build_faq_index
 from ..models import IndexRebuildResponse
 from ..recommenders import refresh_embeddings
+from ..services.logic import reset_response_caches
 from ..settings import get_settings
 
 router = APIRouter(tags=["index"])
@@ -17,7 +20,7 @@ async def rebuild_index(request: Request) -> IndexRebuildResponse:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Endpoint disabled")
 
     token = request.headers.get("X-Admin-Token")
-    if token != settings.admin_token:
+    if not hmac.compare_digest((token or "").encode(), settings.admin_token.encode()):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
 
     if not settings.faq_source_path:
@@ -29,6 +32,7 @@ async def rebuild_index(request: Request) -> IndexRebuildResponse:
     try:
         records = build_faq_index()
         refresh_embeddings()
+        reset_response_caches()
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
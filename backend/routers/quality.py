@@ -13,6 +13,7 @@ from ..services.logic import (
     handle_response_submission,
     handle_template_vote,
 )
+from ._common import extract_context
 
 router = APIRouter(tags=["quality"])
 
@@ -22,14 +23,9 @@ async def classification_vote_endpoint(
     payload: ClassificationVoteRequest,
     request: Request,
 ) -> ActionResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
+    client_ip, user_agent = extract_context(request, payload)
 
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
-
-    return handle_classification_vote(
+    return await handle_classification_vote(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
@@ -41,14 +37,9 @@ async def template_vote_endpoint(
     payload: TemplateVoteRequest,
     request: Request,
 ) -> ActionResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
-
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
+    client_ip, user_agent = extract_context(request, payload)
 
-    return handle_template_vote(
+    return await handle_template_vote(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
@@ -60,14 +51,9 @@ async def response_history_endpoint(
     payload: ResponseLogRequest,
     request: Request,
 ) -> ActionResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
-
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
+    client_ip, user_agent = extract_context(request, payload)
 
-    return handle_response_submission(
+    return await handle_response_submission(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
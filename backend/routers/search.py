@@ -4,20 +4,16 @@ from fastapi import APIRouter, Request
 
 from ..models import SearchRequest, SearchResponse, SpellCheckRequest, SpellCheckResponse
 from ..services.logic import handle_search, handle_spell_check
+from ._common import extract_context
 
 router = APIRouter(tags=["search"])
 
 
 @router.post("/search", response_model=SearchResponse)
 async def search_endpoint(payload: SearchRequest, request: Request) -> SearchResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
+    client_ip, user_agent = extract_context(request, payload)
 
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
-
-    return handle_search(
+    return await handle_search(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
@@ -26,14 +22,9 @@ async def search_endpoint(payload: SearchRequest, request: Request) -> SearchRes
 
 @router.post("/spellcheck", response_model=SpellCheckResponse)
 async def spellcheck_endpoint(payload: SpellCheckRequest, request: Request) -> SpellCheckResponse:
-    session_header = request.headers.get("X-Session-Id")
-    if session_header and not payload.session_id:
-        payload.session_id = session_header[:128]
-
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("User-Agent")
+    client_ip, user_agent = extract_context(request, payload)
 
-    return handle_spell_check(
+    return await handle_spell_check(
         payload,
         client_ip=client_ip,
         user_agent=user_agent,
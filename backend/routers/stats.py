@@ -10,4 +10,4 @@ router = APIRouter(tags=["stats"])
 
 @router.get("/stats/summary", response_model=StatsSummary)
 async def stats_summary() -> StatsSummary:
-    return read_stats_summary()
+    return await read_stats_summary()
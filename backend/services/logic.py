@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from threading import Lock
-from typing import Deque, Dict, Iterable, Optional
+from functools import lru_cache
+from threading import Event, Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
+import orjson
 from fastapi import HTTPException, status
 
+from ..background import BatchWriter
 from ..chat_storage import (
     ChatMessage,
     delete_all_messages,
@@ -21,7 +26,6 @@ from ..chat_storage import (
 from ..classifiers import classify_and_ner, detect_products
 from ..models import (
     ActionResponse,
-    ChatHistoryResponse,
     ChatMessagePayload,
     ChatMessageRequest,
     ChatMessageResponse,
@@ -41,7 +45,7 @@ from ..models import (
     StatsSummary,
     TemplateVoteRequest,
 )
-from ..recommenders import preload_embeddings, semantic_search
+from ..recommenders import embed_query, preload_embeddings, semantic_search
 from ..repository import fetch_categories, fetch_records_by_ids
 from ..scibox_client import get_scibox_client
 from ..settings import get_settings
@@ -55,6 +59,8 @@ from ..storage import (
     record_request_history,
     record_template_vote,
 )
+from .semantic_cache import ExactMatchCache, SemanticCache
+from .template_fetcher import TemplateFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +69,7 @@ init_storage()
 init_chat_storage()
 
 SEARCH_SCORE_THRESHOLD = 0.5
+EXACT_CACHE_SIZE = 2048
 
 SPELLCHECK_SYSTEM_PROMPT = (
     "Ты редактор текста службы поддержки. Исправь орфографические, грамматические и "
@@ -72,48 +79,163 @@ SPELLCHECK_SYSTEM_PROMPT = (
 
 
 class RateLimiter:
-    """Simple sliding window rate limiter backed by an in-memory deque."""
+    """Sliding window rate limiter built from per-key counters of coarse time slots.
 
-    def __init__(self, max_requests: int, window_seconds: int) -> None:
+    Keys are spread over independently locked shards so concurrent requests
+    for different clients do not contend on one mutex. Each shard keeps keys
+    in least-recently-used order: idle keys are dropped once their window has
+    passed, and the shard never holds more than its share of ``max_keys``.
+    """
+
+    SLOTS_PER_WINDOW = 10
+    SHARD_COUNT = 16  # power of two: the shard is picked with a bit mask
+
+    def __init__(self, max_requests: int, window_seconds: int, max_keys: int = 100_000) -> None:
         self._max_requests = max(1, max_requests)
         self._window = max(1, window_seconds)
-        self._lock = Lock()
-        self._store: Dict[str, Deque[float]] = defaultdict(deque)
+        self._granularity = max(1, self._window // self.SLOTS_PER_WINDOW)
+        self._slots = -(-self._window // self._granularity)
+        self._max_keys_per_shard = max(1, max_keys // self.SHARD_COUNT)
+        self._shards: List[Tuple[Lock, OrderedDict[str, Dict[int, int]]]] = [
+            (Lock(), OrderedDict()) for _ in range(self.SHARD_COUNT)
+        ]
 
     def check(self, key: Optional[str]) -> bool:
         if not key:
             return True
-        now = time.monotonic()
-        with self._lock:
-            bucket = self._store[key]
-            while bucket and now - bucket[0] > self._window:
-                bucket.popleft()
-            if len(bucket) >= self._max_requests:
+        current_slot = int(time.monotonic() // self._granularity)
+        oldest_slot = current_slot - self._slots + 1
+        lock, store = self._shards[hash(key) & (self.SHARD_COUNT - 1)]
+        with lock:
+            self._drop_idle_keys(store, oldest_slot)
+            counters = store.get(key)
+            if counters is None:
+                counters = store[key] = {}
+                if len(store) > self._max_keys_per_shard:
+                    store.popitem(last=False)
+            else:
+                store.move_to_end(key)
+                for slot in [slot for slot in counters if slot < oldest_slot]:
+                    del counters[slot]
+            if sum(counters.values()) >= self._max_requests:
                 return False
-            bucket.append(now)
+            counters[current_slot] = counters.get(current_slot, 0) + 1
         return True
 
+    @staticmethod
+    def _drop_idle_keys(store: OrderedDict[str, Dict[int, int]], oldest_slot: int) -> None:
+        while store:
+            idle_key, counters = next(iter(store.items()))
+            if counters and max(counters) >= oldest_slot:
+                return
+            del store[idle_key]
+
+
+class ConcurrentLimiter:
+    """Cap the number of in-flight requests per key, complementing RateLimiter."""
+
+    SHARD_COUNT = 16
+
+    def __init__(self, max_inflight: int) -> None:
+        self._max_inflight = max(1, max_inflight)
+        self._shards: List[Tuple[Lock, Dict[str, int]]] = [
+            (Lock(), {}) for _ in range(self.SHARD_COUNT)
+        ]
+
+    def try_acquire(self, key: Optional[str]) -> bool:
+        if not key:
+            return True
+        lock, inflight = self._shards[hash(key) & (self.SHARD_COUNT - 1)]
+        with lock:
+            current = inflight.get(key, 0)
+            if current >= self._max_inflight:
+                return False
+            inflight[key] = current + 1
+        return True
+
+    def release(self, key: Optional[str]) -> None:
+        if not key:
+            return
+        lock, inflight = self._shards[hash(key) & (self.SHARD_COUNT - 1)]
+        with lock:
+            remaining = inflight.get(key, 0) - 1
+            if remaining > 0:
+                inflight[key] = remaining
+            else:
+                inflight.pop(key, None)
+
 
 rate_limiter = RateLimiter(
     max_requests=settings.rate_limit_max_requests,
     window_seconds=settings.rate_limit_window_seconds,
 )
 
-WARMUP_PERFORMED = False
+FEEDBACK_PATH = DATA_DIR / "feedback.jsonl"
+
+
+def _append_feedback(records: List[Dict[str, Any]]) -> None:
+    FEEDBACK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with FEEDBACK_PATH.open("ab") as fh:
+        fh.write(
+            b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records)
+        )
+
+
+feedback_writer: BatchWriter[Dict[str, Any]] = BatchWriter(
+    _append_feedback,
+    name="feedback-writer",
+    max_batch=100,
+    max_delay=0.2,
+)
+
+template_fetcher = TemplateFetcher(fetch_records_by_ids)
+
+exact_search_cache = ExactMatchCache(EXACT_CACHE_SIZE)
+exact_classify_cache = ExactMatchCache(EXACT_CACHE_SIZE)
+search_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    ttl_seconds=settings.semantic_cache_ttl_seconds,
+    max_entries=settings.semantic_cache_max_entries,
+)
+classify_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    ttl_seconds=settings.semantic_cache_ttl_seconds,
+    max_entries=settings.semantic_cache_max_entries,
+)
+
+concurrent_limiter = ConcurrentLimiter(settings.rate_limit_max_inflight)
+
+_WARMUP_DONE = Event()
+_WARMUP_LOCK = Lock()
+MAX_REQUEST_BYTES = settings.max_request_bytes
+WARMUP_ENABLED = settings.warmup_enabled
+SEMANTIC_CACHE_ENABLED = settings.semantic_cache_enabled
+
+
+def _warmup_noop() -> None:
+    return None
 
 
 def perform_warmup() -> None:
-    global WARMUP_PERFORMED
-    if WARMUP_PERFORMED or not settings.warmup_enabled:
+    """Warm up clients and caches once; afterwards handlers call a no-op."""
+    global perform_warmup
+    if _WARMUP_DONE.is_set():
         return
-    try:
-        get_scibox_client()
-        fetch_categories()
-        preload_embeddings()
-    except Exception as exc:  # pragma: no cover - defensive logging
-        logger.warning("Warmup failed: %s", exc)
-    else:
-        WARMUP_PERFORMED = True
+    if not WARMUP_ENABLED:
+        perform_warmup = _warmup_noop
+        return
+    with _WARMUP_LOCK:
+        if _WARMUP_DONE.is_set():
+            return
+        try:
+            get_scibox_client()
+            fetch_categories()
+            preload_embeddings()
+        except Exception as exc:  # pragma: no cover - defensive logging
+            logger.warning("Warmup failed: %s", exc)
+        else:
+            _WARMUP_DONE.set()
+            perform_warmup = _warmup_noop
 
 
 def _assert_rate_limit(key: Optional[str]) -> None:
@@ -125,14 +247,35 @@ def _assert_rate_limit(key: Optional[str]) -> None:
     )
 
 
+@contextmanager
+def _limit_concurrency(key: Optional[str]) -> Iterator[None]:
+    if not concurrent_limiter.try_acquire(key):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent requests. Please retry later.",
+        )
+    try:
+        yield
+    finally:
+        concurrent_limiter.release(key)
+
+
 def _ensure_size_limit(value: str) -> None:
-    if len(value.encode("utf-8")) > settings.max_request_bytes:
+    length = len(value)
+    # A UTF-8 code point takes 1-4 bytes, so the character count bounds the size.
+    if length * 4 <= MAX_REQUEST_BYTES:
+        return
+    # isascii() reads a flag CPython keeps on every str, so ASCII needs no encoding.
+    if length > MAX_REQUEST_BYTES or (
+        not value.isascii() and len(value.encode("utf-8")) > MAX_REQUEST_BYTES
+    ):
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail="Request payload exceeds size limits.",
         )
 
 
+@lru_cache(maxsize=4096)
 def _derive_rate_key(session_id: Optional[str], client_ip: Optional[str]) -> Optional[str]:
     if session_id:
         return f"session:{session_id}"
@@ -141,8 +284,80 @@ def _derive_rate_key(session_id: Optional[str], client_ip: Optional[str]) -> Opt
     return None
 
 
+def _embed_for_cache(text: str) -> Optional[np.ndarray]:
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    try:
+        return embed_query(text)
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.warning("Semantic cache lookup skipped: %s", exc)
+        return None
+
+
+def _run_search(query: str, top_k: int, products: Sequence[str]) -> List[Dict[str, Any]]:
+    query_vector = _embed_for_cache(query)
+    if query_vector is None:
+        return semantic_search(query, top_k=top_k, products=products)
+
+    scope = ("search", top_k, tuple(products))
+    cached = search_cache.get(query_vector, scope)
+    if cached is not None:
+        return cached
+    results = semantic_search(
+        query,
+        top_k=top_k,
+        products=products,
+        query_vector=query_vector,
+    )
+    search_cache.put(query_vector, scope, results)
+    return results
+
+
+def _run_classification(text: str) -> Dict[str, Any]:
+    cache_key = text.strip()
+    cached = exact_classify_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    classification = _classify_uncached(text)
+    if classification.get("matched_template_id") is not None:
+        # Промахи не кэшируются: они бывают вызваны временным сбоем эмбеддингов.
+        exact_classify_cache.put(cache_key, dict(classification))
+    return classification
+
+
+def _classify_uncached(text: str) -> Dict[str, Any]:
+    query_vector = _embed_for_cache(text)
+    if query_vector is None:
+        return classify_and_ner(text)
+
+    cached = classify_cache.get(query_vector, "classify")
+    if cached is not None:
+        return dict(cached)
+    classification = classify_and_ner(text, query_vector=query_vector)
+    if classification.get("matched_template_id") is not None:
+        classify_cache.put(query_vector, "classify", dict(classification))
+    return classification
+
+
+def reset_response_caches() -> None:
+    """Drop cached search/classification results, e.g. after an index rebuild."""
+    exact_search_cache.clear()
+    exact_classify_cache.clear()
+    search_cache.clear()
+    classify_cache.clear()
+
+
 def _make_snippet(text: str, max_len: int = 280) -> str:
-    snippet = (text or "").strip().replace("\n", " ")
+    if not text:
+        return ""
+    if (
+        len(text) <= max_len
+        and not text[0].isspace()
+        and not text[-1].isspace()
+        and "\n" not in text
+    ):
+        return text
+    snippet = text.strip().replace("\n", " ")
     if len(snippet) <= max_len:
         return snippet
     return snippet[: max_len - 1].rstrip() + "..."
@@ -161,35 +376,43 @@ def _message_content_to_text(message: object) -> str:
     return ""
 
 
+_SENDER_MAP: Dict[Optional[str], str] = {
+    "bot": "support",
+    "support": "support",
+    "client": "client",
+    "user": "client",
+}
+
+
 def _normalize_sender(value: Optional[str]) -> str:
-    if value == "bot":
-        return "support"
-    if value == "support":
-        return "support"
-    if value == "client" or value == "user":
-        return "client"
-    return "client"
+    return _SENDER_MAP.get(value, "client")
 
 
 def _normalize_answer_text(value: Optional[str]) -> str:
     return " ".join((value or "").split())
 
 
+def _message_to_dict(message: ChatMessage) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "sender": _SENDER_MAP.get(message.sender, "client"),
+        "text": message.text,
+        "category": message.category,
+        "subcategory": message.subcategory,
+        "template_answer": message.template_answer,
+        "template_source": message.template_source,
+        "template_unmodified": bool(message.template_unmodified),
+        "timestamp": message.timestamp,
+    }
+
+
 def _message_to_payload(message: ChatMessage) -> ChatMessagePayload:
-    return ChatMessagePayload(
-        id=message.id,
-        sender=_normalize_sender(message.sender),
-        text=message.text,
-        category=message.category,
-        subcategory=message.subcategory,
-        template_answer=message.template_answer,
-        template_source=message.template_source,
-        template_unmodified=bool(message.template_unmodified),
-        timestamp=message.timestamp,
-    )
+    # Rows come from our own database with already normalized values, so the
+    # payload is built without re-running Pydantic validation.
+    return ChatMessagePayload.model_construct(**_message_to_dict(message))
 
 
-def handle_search(
+async def handle_search(
     request: SearchRequest,
     *,
     client_ip: Optional[str],
@@ -201,16 +424,21 @@ def handle_search(
     _assert_rate_limit(rate_key)
 
     started = time.perf_counter()
-    products = detect_products(request.query)
-    raw_results = semantic_search(
-        request.query,
-        top_k=request.top_k,
-        products=products,
-    )
+    cache_key = (request.query.strip().lower(), request.top_k)
+    cached = exact_search_cache.get(cache_key)
+    if cached is None:
+        products = detect_products(request.query)
+        with _limit_concurrency(rate_key):
+            raw_results = await asyncio.to_thread(
+                _run_search, request.query, request.top_k, products
+            )
+        exact_search_cache.put(cache_key, (products, raw_results))
+    else:
+        products, raw_results = cached
     latency_ms = (time.perf_counter() - started) * 1000
 
     results = [
-        SearchResult(
+        SearchResult.model_construct(
             id=int(item["id"]),
             title=item.get("question", ""),
             snippet=_make_snippet(item.get("answer", "")),
@@ -249,7 +477,7 @@ def handle_search(
     return SearchResponse(results=results, latency_ms=round(latency_ms, 2))
 
 
-def handle_spell_check(
+async def handle_spell_check(
     request: SpellCheckRequest,
     *,
     client_ip: Optional[str],
@@ -262,13 +490,15 @@ def handle_spell_check(
 
     started = time.perf_counter()
     client = get_scibox_client()
-    message = client.chat(
-        [
-            {"role": "system", "content": SPELLCHECK_SYSTEM_PROMPT},
-            {"role": "user", "content": request.text},
-        ],
-        temperature=0.0,
-    )
+    with _limit_concurrency(rate_key):
+        message = await asyncio.to_thread(
+            client.chat,
+            [
+                {"role": "system", "content": SPELLCHECK_SYSTEM_PROMPT},
+                {"role": "user", "content": request.text},
+            ],
+            temperature=0.0,
+        )
     corrected = _message_content_to_text(message) or request.text
     latency_ms = (time.perf_counter() - started) * 1000
 
@@ -287,7 +517,7 @@ def handle_spell_check(
     return SpellCheckResponse(corrected=corrected)
 
 
-def handle_classify(
+async def handle_classify(
     request: ClassifyRequest,
     *,
     client_ip: Optional[str],
@@ -299,7 +529,8 @@ def handle_classify(
     _assert_rate_limit(rate_key)
 
     started = time.perf_counter()
-    classification = classify_and_ner(request.text)
+    with _limit_concurrency(rate_key):
+        classification = await asyncio.to_thread(_run_classification, request.text)
     latency_ms = (time.perf_counter() - started) * 1000
     matched_score = float(
         classification.get("matched_template_score")
@@ -342,7 +573,7 @@ def handle_classify(
     return ClassifyResponse(label=label, confidence=confidence, raw=classification)
 
 
-def handle_chat_message(
+async def handle_chat_message(
     request: ChatMessageRequest,
     *,
     client_ip: Optional[str],
@@ -371,28 +602,29 @@ def handle_chat_message(
 
     if sender == "client":
         perform_warmup()
-        started = time.perf_counter()
-        classification = classify_and_ner(text)
-        latency_ms = (time.perf_counter() - started) * 1000
+        started_ns = time.perf_counter_ns()
+        with _limit_concurrency(rate_key):
+            classification = await asyncio.to_thread(classify_and_ner, text)
+        latency_ms = (time.perf_counter_ns() - started_ns) / 1_000_000
 
         template_id = classification.get("matched_template_id")
         answer_record = None
         if template_id:
             try:
-                answer_record = fetch_records_by_ids([int(template_id)]).get(int(template_id))
+                answer_record = await template_fetcher.get(int(template_id))
             except Exception as exc:  # pragma: no cover - defensive logging
                 logger.warning("Failed to fetch template %s: %s", template_id, exc)
 
         fallback_answer = (
             "Извините, я пока не нашёл подходящего ответа. Пожалуйста, уточните запрос."
         )
-        category = (answer_record or {}).get("category") or classification.get("category")
-        subcategory = (answer_record or {}).get("subcategory") or classification.get("subcategory")
-        suggested_answer = (
-            (answer_record or {}).get("answer")
-            or request.template_answer
-            or fallback_answer
-        )
+        category = classification.get("category")
+        subcategory = classification.get("subcategory")
+        suggested_answer = request.template_answer or fallback_answer
+        if answer_record is not None:
+            category = answer_record.category or category
+            subcategory = answer_record.subcategory or subcategory
+            suggested_answer = answer_record.answer or suggested_answer
 
         client_message = ChatMessage(
             sender="client",
@@ -402,7 +634,7 @@ def handle_chat_message(
             template_answer=None,
             timestamp=timestamp,
         )
-        saved_messages = persist_messages([client_message])
+        saved_messages = await asyncio.to_thread(persist_messages, [client_message])
 
         log_event(
             "chat",
@@ -442,7 +674,7 @@ def handle_chat_message(
             template_unmodified=template_unmodified,
             timestamp=timestamp,
         )
-        saved_messages = persist_messages([support_message])
+        saved_messages = await asyncio.to_thread(persist_messages, [support_message])
 
         log_event(
             "chat",
@@ -472,21 +704,24 @@ def handle_chat_message(
         )
 
     payload_messages = [_message_to_payload(message) for message in saved_messages]
-    return ChatMessageResponse(messages=payload_messages, suggestion=suggestion)
+    return ChatMessageResponse.model_construct(messages=payload_messages, suggestion=suggestion)
 
 
-def handle_chat_history() -> ChatHistoryResponse:
-    messages = [_message_to_payload(item) for item in list_messages()]
-    return ChatHistoryResponse(messages=messages)
+async def handle_chat_history() -> Dict[str, List[Dict[str, Any]]]:
+    # The router validates this against ChatHistoryResponse once while
+    # serializing, so intermediate payload models are not built here.
+    stored = await asyncio.to_thread(list_messages)
+    return {"messages": [_message_to_dict(item) for item in stored]}
 
 
-def handle_chat_clear() -> ActionResponse:
-    delete_all_messages()
+async def handle_chat_clear() -> ActionResponse:
+    await asyncio.to_thread(delete_all_messages)
+    reset_response_caches()
     logger.info("Chat history cleared by operator.")
     return ActionResponse()
 
 
-def handle_feedback(
+async def handle_feedback(
     request: FeedbackRequest,
     *,
     client_ip: Optional[str],
@@ -498,16 +733,16 @@ def handle_feedback(
     rate_key = _derive_rate_key(request.session_id, client_ip)
     _assert_rate_limit(rate_key)
 
-    record = request.model_dump()
-    record["timestamp"] = datetime.now(timezone.utc).isoformat()
-    record["user_agent"] = user_agent or ""
-    record["client_ip"] = client_ip or ""
+    # FeedbackRequest holds only plain scalars, so its field dict can be copied
+    # as is; orjson renders the datetime on the writer thread.
+    record = {
+        **request.__dict__,
+        "timestamp": datetime.now(timezone.utc),
+        "user_agent": user_agent or "",
+        "client_ip": client_ip or "",
+    }
 
-    feedback_path = DATA_DIR / "feedback.jsonl"
-    feedback_path.parent.mkdir(parents=True, exist_ok=True)
-    with feedback_path.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
-        fh.flush()
+    feedback_writer.submit(record)
 
     log_event(
         "feedback",
@@ -523,7 +758,7 @@ def handle_feedback(
     return FeedbackResponse()
 
 
-def handle_message_feedback(
+async def handle_message_feedback(
     message_id: int,
     request: MessageFeedbackRequest,
     *,
@@ -533,7 +768,7 @@ def handle_message_feedback(
     rate_key = _derive_rate_key(request.session_id, client_ip)
     _assert_rate_limit(rate_key)
 
-    message = get_message_by_id(message_id)
+    message = await asyncio.to_thread(get_message_by_id, message_id)
     if message is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -573,7 +808,7 @@ def handle_message_feedback(
     return ActionResponse()
 
 
-def handle_classification_vote(
+async def handle_classification_vote(
     request: ClassificationVoteRequest,
     *,
     client_ip: Optional[str],
@@ -606,7 +841,7 @@ def handle_classification_vote(
     return ActionResponse()
 
 
-def handle_template_vote(
+async def handle_template_vote(
     request: TemplateVoteRequest,
     *,
     client_ip: Optional[str],
@@ -631,7 +866,7 @@ def handle_template_vote(
     return ActionResponse()
 
 
-def handle_response_submission(
+async def handle_response_submission(
     request: ResponseLogRequest,
     *,
     client_ip: Optional[str],
@@ -673,8 +908,8 @@ def handle_response_submission(
     return ActionResponse()
 
 
-def read_stats_summary() -> StatsSummary:
-    summary = fetch_summary()
+async def read_stats_summary() -> StatsSummary:
+    summary = await asyncio.to_thread(fetch_summary)
     return StatsSummary(
         search=summary["search"],
         classify=summary["classify"],
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+_Entry = Tuple[Hashable, Any, float]
+
+
+class SemanticCache:
+    """In-memory cache of handler results keyed by L2-normalized query embeddings.
+
+    A lookup hits when a stored vector with the same ``scope`` has cosine
+    similarity of at least ``threshold`` with the query and has not expired.
+    Entries live in a fixed-size ring buffer, so the oldest ones are evicted first.
+    """
+
+    def __init__(
+        self, *, threshold: float, ttl_seconds: float, max_entries: int = 1024
+    ) -> None:
+        self._threshold = float(threshold)
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._capacity = max(1, max_entries)
+        self._lock = Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[_Entry]] = [None] * self._capacity
+        self._size = 0
+        self._cursor = 0
+
+    def get(self, vector: np.ndarray, scope: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            if self._vectors is None or not self._size:
+                return None
+            scores = self._vectors[: self._size] @ vector
+            candidates = np.flatnonzero(scores >= self._threshold)
+            for idx in candidates[np.argsort(-scores[candidates])]:
+                entry = self._entries[idx]
+                if entry is None:
+                    continue
+                entry_scope, value, expires_at = entry
+                if entry_scope == scope and expires_at > now:
+                    return value
+        return None
+
+    def put(self, vector: np.ndarray, scope: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self._ttl
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros(
+                    (self._capacity, vector.shape[0]), dtype=np.float32
+                )
+                self._entries = [None] * self._capacity
+                self._size = 0
+                self._cursor = 0
+            slot = self._cursor
+            self._vectors[slot] = vector
+            self._entries[slot] = (scope, value, expires_at)
+            self._cursor = (slot + 1) % self._capacity
+            self._size = min(self._size + 1, self._capacity)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self._capacity
+            self._size = 0
+            self._cursor = 0
+
+
+class ExactMatchCache:
+    """Thread-safe LRU for results of verbatim repeated queries (L1 in front of SemanticCache)."""
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self._capacity = max(1, max_entries)
+        self._lock = Lock()
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._capacity:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..repository import FaqRecord
+
+
+class TemplateFetcher:
+    """Coalesce concurrent single-record FAQ lookups into one batched query.
+
+    ``get`` registers a future for the id; pending ids are fetched together
+    ``max_delay`` seconds after the first one arrived, or immediately once
+    ``max_batch`` distinct ids are waiting. The blocking query runs in a worker
+    thread so the event loop is not held while SQLite reads.
+
+    Pending state is bound to the event loop that created it and is discarded
+    when ``get`` runs on a different loop, e.g. after a reload or between tests.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Iterable[int]], Dict[int, FaqRecord]],
+        *,
+        max_delay: float = 0.005,
+        max_batch: int = 64,
+    ) -> None:
+        self._fetch = fetch
+        self._max_delay = max(0.0, max_delay)
+        self._max_batch = max(1, max_batch)
+        self._pending: Dict[int, List[asyncio.Future[Optional[FaqRecord]]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    async def get(self, record_id: int) -> Optional[FaqRecord]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._bind(loop)
+        future: asyncio.Future[Optional[FaqRecord]] = loop.create_future()
+        self._pending.setdefault(int(record_id), []).append(future)
+        if len(self._pending) >= self._max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._dispatch)
+        return await future
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        # A timer or batch left on a closed loop would never fire, and its
+        # futures have no waiters any more.
+        self._loop = loop
+        self._pending = {}
+        self._timer = None
+        self._tasks = set()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._resolve(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(
+        self, batch: Dict[int, List[asyncio.Future[Optional[FaqRecord]]]]
+    ) -> None:
+        try:
+            records = await asyncio.to_thread(self._fetch, list(batch))
+        except Exception as exc:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        for record_id, futures in batch.items():
+            record = records.get(record_id)
+            for future in futures:
+                if not future.done():
+                    future.set_result(record)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Literal, Optional, Tuple
 
 from pydantic import Field, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -32,8 +32,16 @@ class Settings(BaseSettings):
 
     rate_limit_window_seconds: int = Field(1000, alias="RATE_LIMIT_WINDOW")
     rate_limit_max_requests: int = Field(60, alias="RATE_LIMIT_MAX_REQUESTS")
+    rate_limit_max_inflight: int = Field(8, alias="RATE_LIMIT_MAX_INFLIGHT")
     warmup_enabled: bool = Field(False, alias="WARMUP")
     max_request_bytes: int = Field(100_000, alias="MAX_REQUEST_BYTES")
+    semantic_cache_enabled: bool = Field(False, alias="SEMANTIC_CACHE")
+    semantic_cache_threshold: float = Field(0.95, alias="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_ttl_seconds: int = Field(300, alias="SEMANTIC_CACHE_TTL")
+    semantic_cache_max_entries: int = Field(1024, alias="SEMANTIC_CACHE_MAX_ENTRIES")
+    embedding_precision: Literal["float32", "float16", "int8"] = Field(
+        "float32", alias="EMBEDDING_PRECISION"
+    )
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
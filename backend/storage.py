@@ -1,26 +1,114 @@
 from __future__ import annotations
 
-import json
+import atexit
+import heapq
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import orjson
+
+from .background import BatchWriter
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 STATS_DB_PATH = DATA_DIR / "stats.db"
 
+DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-@contextmanager
-def _get_connection() -> Iterator[sqlite3.Connection]:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(STATS_DB_PATH)
+
+# Every thread keeps one connection open for the life of the process; SQLite
+# itself serializes writers, the lock only keeps our own threads from
+# colliding on BEGIN IMMEDIATE and getting SQLITE_BUSY.
+_local = threading.local()
+_WRITE_LOCK = threading.Lock()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _convert_timestamp(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+# Columns declared TIMESTAMP come back as datetime objects, decoded by the
+# driver while it builds each row.
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+
+
+def _open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        STATS_DB_PATH,
+        check_same_thread=False,
+        isolation_level=None,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        cached_statements=256,
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _get_connection() -> sqlite3.Connection:
+    try:
+        return _local.conn
+    except AttributeError:
+        conn = _local.conn = _open_connection()
+        with _connections_lock:
+            _connections.append(conn)
+        return conn
+
+
+def _close_connections() -> None:
+    # Registered before the storage writer, so atexit runs it after the final
+    # flush; closing the last connection checkpoints and removes the WAL file.
+    with _connections_lock:
+        connections = list(_connections)
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(_close_connections)
+
+
+@contextmanager
+def _write_transaction() -> Iterator[sqlite3.Connection]:
+    conn = _get_connection()
+    with _WRITE_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+@contextmanager
+def _read_transaction() -> Iterator[sqlite3.Connection]:
+    """Run several reads against one WAL snapshot instead of one per statement."""
+    conn = _get_connection()
+    conn.execute("BEGIN")
     try:
         yield conn
     finally:
-        conn.close()
+        conn.execute("COMMIT")
 
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
@@ -32,7 +120,7 @@ def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
 
 
 def _get_table_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
-    rows = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    rows = conn.execute(f'PRAGMA table_xinfo("{table}")').fetchall()
     return {row["name"] for row in rows}
 
 
@@ -121,8 +209,120 @@ def _migrate_request_history(conn: sqlite3.Connection) -> None:
     conn.execute("DROP TABLE request_history_legacy")
 
 
+_EVENT_METRIC_COLUMNS: Dict[str, str] = {
+    "result_count": "INTEGER GENERATED ALWAYS AS "
+    "(CAST(json_extract(payload, '$.result_count') AS INTEGER)) VIRTUAL",
+    "top_score": "REAL GENERATED ALWAYS AS "
+    "(CAST(json_extract(payload, '$.top_score') AS REAL)) VIRTUAL",
+    "confidence": "REAL GENERATED ALWAYS AS "
+    "(CAST(json_extract(payload, '$.confidence') AS REAL)) VIRTUAL",
+    "useful": "INTEGER GENERATED ALWAYS AS "
+    "(CAST(json_extract(payload, '$.useful') AS INTEGER)) VIRTUAL",
+}
+
+
+def _migrate_event_metrics(conn: sqlite3.Connection) -> None:
+    # ALTER TABLE can only add VIRTUAL generated columns. They are computed on
+    # read; the event_counters backfill and trigger are their only readers.
+    columns = _get_table_columns(conn, "events")
+    for name, definition in _EVENT_METRIC_COLUMNS.items():
+        if name not in columns:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {name} {definition}")
+
+
+_CREATE_EVENT_COUNTERS_SQL = """
+    CREATE TABLE event_counters (
+        kind TEXT PRIMARY KEY,
+        total INTEGER NOT NULL,
+        success INTEGER NOT NULL,
+        latency_sum REAL NOT NULL,
+        latency_n INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        score_n INTEGER NOT NULL
+    ) WITHOUT ROWID
+"""
+
+_BACKFILL_EVENT_COUNTERS_SQL = """
+    INSERT INTO event_counters (
+        kind, total, success, latency_sum, latency_n, score_sum, score_n
+    )
+    SELECT
+        kind,
+        COUNT(*),
+        COUNT(
+            CASE
+                WHEN kind = 'search' AND result_count > 0 THEN 1
+                WHEN kind = 'classify' AND confidence >= 0.5 THEN 1
+                WHEN kind = 'feedback' AND useful = 1 THEN 1
+            END
+        ),
+        TOTAL(latency_ms),
+        COUNT(latency_ms),
+        TOTAL(CASE kind WHEN 'search' THEN top_score WHEN 'classify' THEN confidence END),
+        COUNT(CASE kind WHEN 'search' THEN top_score WHEN 'classify' THEN confidence END)
+    FROM events
+    WHERE kind IN ('search', 'classify', 'feedback')
+    GROUP BY kind
+"""
+
+# Keeps the dashboard totals current for every insert path, including the
+# batched executemany in the storage writer.
+_EVENT_COUNTERS_TRIGGER_SQL = """
+    CREATE TRIGGER IF NOT EXISTS events_update_counters
+    AFTER INSERT ON events
+    WHEN NEW.kind IN ('search', 'classify', 'feedback')
+    BEGIN
+        INSERT INTO event_counters (
+            kind, total, success, latency_sum, latency_n, score_sum, score_n
+        )
+        VALUES (
+            NEW.kind,
+            1,
+            COALESCE(
+                CASE NEW.kind
+                    WHEN 'search' THEN NEW.result_count > 0
+                    WHEN 'classify' THEN NEW.confidence >= 0.5
+                    ELSE NEW.useful = 1
+                END,
+                0
+            ),
+            COALESCE(NEW.latency_ms, 0.0),
+            NEW.latency_ms IS NOT NULL,
+            COALESCE(
+                CASE NEW.kind WHEN 'search' THEN NEW.top_score WHEN 'classify' THEN NEW.confidence END,
+                0.0
+            ),
+            CASE NEW.kind WHEN 'search' THEN NEW.top_score WHEN 'classify' THEN NEW.confidence END
+                IS NOT NULL
+        )
+        ON CONFLICT (kind) DO UPDATE SET
+            total = total + excluded.total,
+            success = success + excluded.success,
+            latency_sum = latency_sum + excluded.latency_sum,
+            latency_n = latency_n + excluded.latency_n,
+            score_sum = score_sum + excluded.score_sum,
+            score_n = score_n + excluded.score_n;
+    END
+"""
+
+
+def _ensure_event_counters(conn: sqlite3.Connection) -> None:
+    if not _table_exists(conn, "event_counters"):
+        conn.execute(_CREATE_EVENT_COUNTERS_SQL)
+        conn.execute(_BACKFILL_EVENT_COUNTERS_SQL)
+    conn.execute(_EVENT_COUNTERS_TRIGGER_SQL)
+
+
+# Stored in PRAGMA user_version once init_storage has brought the schema up to
+# date; bump it whenever tables, indexes or triggers below change.
+STATS_SCHEMA_VERSION = 1
+
+
 def init_storage() -> None:
-    with _get_connection() as conn:
+    (version,) = _get_connection().execute("PRAGMA user_version").fetchone()
+    if version >= STATS_SCHEMA_VERSION:
+        return
+    with _write_transaction() as conn:
         _migrate_request_history(conn)
         conn.execute(
             """
@@ -144,6 +344,15 @@ def init_storage() -> None:
             ON events(kind, ts DESC)
             """
         )
+        _migrate_event_metrics(conn)
+        _ensure_event_counters(conn)
+        conn.execute("DROP INDEX IF EXISTS idx_events_metrics")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_events_recent
+            ON events(ts DESC, id DESC, kind, session_id)
+            """
+        )
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS classification_votes (
@@ -159,10 +368,11 @@ def init_storage() -> None:
         )
         conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_classification_votes_pair
-            ON classification_votes(category, subcategory, target)
+            CREATE INDEX IF NOT EXISTS idx_classification_votes_rollup
+            ON classification_votes(target, category, subcategory, is_correct)
             """
         )
+        conn.execute("DROP INDEX IF EXISTS idx_classification_votes_pair")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS template_votes (
@@ -215,11 +425,78 @@ def init_storage() -> None:
         )
         conn.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_request_history_ts
-            ON request_history(ts DESC)
+            CREATE INDEX IF NOT EXISTS idx_request_history_recent
+            ON request_history(ts DESC, id DESC)
             """
         )
-        conn.commit()
+        conn.execute("DROP INDEX IF EXISTS idx_request_history_ts")
+        conn.execute(f"PRAGMA user_version = {STATS_SCHEMA_VERSION}")
+
+
+# SQLite 3.45+ stores payloads as pre-parsed JSONB, so the generated metric
+# columns skip text parsing; json_extract reads both encodings, so rows
+# written by older builds stay readable without a migration.
+_JSON_PARAM_SQL = "jsonb(?)" if sqlite3.sqlite_version_info >= (3, 45, 0) else "?"
+
+_INSERT_EVENT_SQL = f"""
+    INSERT INTO events (kind, session_id, user_agent, latency_ms, payload, extra)
+    VALUES (?, ?, ?, ?, {_JSON_PARAM_SQL}, {_JSON_PARAM_SQL})
+"""
+_INSERT_CLASSIFICATION_VOTE_SQL = """
+    INSERT INTO classification_votes (session_id, category, subcategory, target, is_correct)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_TEMPLATE_VOTE_SQL = """
+    INSERT INTO template_votes (session_id, is_positive)
+    VALUES (?, ?)
+"""
+_INSERT_MESSAGE_FEEDBACK_SQL = """
+    INSERT INTO message_feedback (message_id, session_id, useful)
+    VALUES (?, ?, ?)
+"""
+_INSERT_REQUEST_HISTORY_SQL = """
+    INSERT INTO request_history (
+        session_id,
+        query,
+        category,
+        subcategory,
+        main_vote,
+        sub_vote,
+        template_text,
+        template_positive,
+        top_item_id
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+PendingWrite = Tuple[str, Tuple[object, ...]]
+
+
+def _apply_writes(items: List[PendingWrite]) -> None:
+    grouped: Dict[str, List[Tuple[object, ...]]] = {}
+    for sql, params in items:
+        grouped.setdefault(sql, []).append(params)
+    with _write_transaction() as conn:
+        for sql, rows in grouped.items():
+            conn.executemany(sql, rows)
+
+
+_writer: BatchWriter[PendingWrite] = BatchWriter(
+    _apply_writes,
+    name="storage-writer",
+    max_batch=512,
+    max_delay=0.05,
+)
+
+
+_EMPTY_JSON = "{}"
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _encode_json(value: Optional[Dict[str, object]]) -> str:
+    if not value:
+        return _EMPTY_JSON
+    return orjson.dumps(value, option=_JSON_OPTIONS).decode()
 
 
 def log_event(
@@ -231,23 +508,24 @@ def log_event(
     payload: Optional[Dict[str, object]] = None,
     extra: Optional[Dict[str, object]] = None,
 ) -> None:
+    """Queue an event; it is inserted together with others by a background writer."""
     record = (
         kind.strip(),
         session_id.strip() if session_id else None,
         user_agent.strip() if user_agent else None,
         float(latency_ms) if latency_ms is not None else None,
-        json.dumps(payload or {}, ensure_ascii=False),
-        json.dumps(extra or {}, ensure_ascii=False),
+        _encode_json(payload),
+        _encode_json(extra),
     )
-    with _get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO events (kind, session_id, user_agent, latency_ms, payload, extra)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            record,
-        )
-        conn.commit()
+    _writer.submit((_INSERT_EVENT_SQL, record))
+
+
+FLUSH_TIMEOUT_SECONDS = 1.0
+
+
+def flush_now(timeout: Optional[float] = FLUSH_TIMEOUT_SECONDS) -> bool:
+    """Wait until events and votes queued so far are written; ``False`` on timeout."""
+    return _writer.flush(timeout)
 
 
 @dataclass
@@ -259,86 +537,100 @@ class AggregateResult:
     score_samples: int = 0
 
 
-def _fetch_scalar(query: str, params: Iterable[object] = ()) -> float:
-    with _get_connection() as conn:
-        row = conn.execute(query, tuple(params)).fetchone()
-        if not row:
-            return 0.0
-        value = row[0]
-    return float(value or 0.0)
+_EVENT_TOTALS_SQL = """
+    SELECT
+        kind,
+        total,
+        success,
+        CASE WHEN latency_n THEN latency_sum / latency_n ELSE 0.0 END,
+        CASE WHEN score_n THEN score_sum / score_n ELSE 0.0 END
+    FROM event_counters
+"""
+
+EventTotals = Tuple[int, int, float, float]
+
+
+def _fetch_event_totals() -> Dict[str, EventTotals]:
+    """Return (total, success, avg latency, avg score) per dashboard event kind."""
+    totals: Dict[str, EventTotals] = {
+        "search": (0, 0, 0.0, 0.0),
+        "classify": (0, 0, 0.0, 0.0),
+        "feedback": (0, 0, 0.0, 0.0),
+    }
+    rows = _get_connection().execute(_EVENT_TOTALS_SQL).fetchall()
+    for kind, total, success, latency, score in rows:
+        totals[kind] = (total, success, latency, score)
+    return totals
+
+
+_RECENT_EVENTS_SQL = """
+    SELECT
+        id,
+        kind,
+        ts AS timestamp,
+        session_id,
+        CASE kind
+            WHEN 'search' THEN 'results=' || COALESCE(result_count, 0)
+            WHEN 'classify' THEN printf('confidence=%.2f', COALESCE(confidence, 0))
+            WHEN 'feedback' THEN CASE WHEN useful THEN 'useful' ELSE 'not useful' END
+            ELSE ''
+        END AS detail
+    FROM events
+    ORDER BY ts DESC, id DESC
+    LIMIT ?
+"""
+
+
+_RECENT_EVENT_FIELDS = ("id", "kind", "timestamp", "session_id", "detail")
+
+
+def _recent_event_row(cursor: sqlite3.Cursor, row: Tuple[object, ...]) -> Dict[str, object]:
+    return dict(zip(_RECENT_EVENT_FIELDS, row))
+
+
+def _fetch_rows(
+    row_factory: Callable[[sqlite3.Cursor, Tuple[object, ...]], Dict[str, object]],
+    sql: str,
+    params: Tuple[object, ...],
+) -> List[Dict[str, object]]:
+    # A per-cursor factory builds each output dict while the row is fetched,
+    # skipping the intermediate sqlite3.Row the connection would create.
+    cursor = _get_connection().cursor()
+    cursor.row_factory = row_factory
+    return cursor.execute(sql, params).fetchall()
 
 
 def _fetch_recent(limit: int = 10) -> List[Dict[str, object]]:
-    with _get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, kind, ts as timestamp, session_id, payload
-            FROM events
-            ORDER BY ts DESC, id DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-    results: List[Dict[str, object]] = []
-    for row in rows:
-        payload: Dict[str, object] = {}
-        try:
-            payload = json.loads(row["payload"] or "{}")
-        except json.JSONDecodeError:
-            payload = {}
-        detail = ""
-        if row["kind"] == "search":
-            detail = f"results={payload.get('result_count', 0)}"
-        elif row["kind"] == "classify":
-            detail = f"confidence={payload.get('confidence', 0):.2f}"
-        elif row["kind"] == "feedback":
-            detail = "useful" if payload.get("useful") else "not useful"
-        results.append(
-            {
-                "id": int(row["id"]),
-                "kind": row["kind"],
-                "timestamp": datetime.fromisoformat(row["timestamp"])
-                if isinstance(row["timestamp"], str)
-                else row["timestamp"],
-                "session_id": row["session_id"],
-                "detail": detail,
-            }
-        )
-    return results
+    return _fetch_rows(_recent_event_row, _RECENT_EVENTS_SQL, (limit,))
 
 
 def _build_bucket(
     *,
-    total: float,
-    success: float,
+    total: int,
+    success: int,
     avg_latency: float,
     avg_score: float,
 ) -> Dict[str, object]:
-    total_int = int(total)
-    success_int = int(success)
-    rate = success_int / total_int if total_int else 0.0
+    rate = success / total if total else 0.0
     return {
-        "total": total_int,
-        "success": success_int,
+        "total": total,
+        "success": success,
         "success_rate": rate,
-        "avg_latency_ms": avg_latency if total_int else None,
-        "avg_score": avg_score if total_int else None,
+        "avg_latency_ms": avg_latency if total else None,
+        "avg_score": avg_score if total else None,
     }
 
 
 def _build_feedback_stats(
     *,
-    total: float,
-    positive: float,
+    total: int,
+    positive: int,
 ) -> Dict[str, object]:
-    total_int = int(total)
-    positive_int = int(positive)
-    negative_int = max(total_int - positive_int, 0)
-    rate = positive_int / total_int if total_int else 0.0
+    rate = positive / total if total else 0.0
     return {
-        "total": total_int,
-        "positive": positive_int,
-        "negative": negative_int,
+        "total": total,
+        "positive": positive,
+        "negative": max(total - positive, 0),
         "positive_rate": rate,
     }
 
@@ -354,12 +646,9 @@ def record_classification_vote(
     normalized_category = category.strip() if category else None
     normalized_subcategory = subcategory.strip() if subcategory else None
     normalized_session = session_id.strip() if session_id else None
-    with _get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO classification_votes (session_id, category, subcategory, target, is_correct)
-            VALUES (?, ?, ?, ?, ?)
-            """,
+    _writer.submit(
+        (
+            _INSERT_CLASSIFICATION_VOTE_SQL,
             (
                 normalized_session,
                 normalized_category,
@@ -368,20 +657,12 @@ def record_classification_vote(
                 1 if is_correct else 0,
             ),
         )
-        conn.commit()
+    )
 
 
 def record_template_vote(*, is_positive: bool, session_id: Optional[str]) -> None:
     normalized_session = session_id.strip() if session_id else None
-    with _get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO template_votes (session_id, is_positive)
-            VALUES (?, ?)
-            """,
-            (normalized_session, 1 if is_positive else 0),
-        )
-        conn.commit()
+    _writer.submit((_INSERT_TEMPLATE_VOTE_SQL, (normalized_session, 1 if is_positive else 0)))
 
 
 def record_message_feedback(
@@ -391,15 +672,9 @@ def record_message_feedback(
     session_id: Optional[str],
 ) -> None:
     normalized_session = session_id.strip() if session_id else None
-    with _get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO message_feedback (message_id, session_id, useful)
-            VALUES (?, ?, ?)
-            """,
-            (int(message_id), normalized_session, 1 if useful else 0),
-        )
-        conn.commit()
+    _writer.submit(
+        (_INSERT_MESSAGE_FEEDBACK_SQL, (int(message_id), normalized_session, 1 if useful else 0))
+    )
 
 
 def record_request_history(
@@ -419,22 +694,9 @@ def record_request_history(
     normalized_subcategory = subcategory.strip() if subcategory else None
     normalized_query = query.strip()
     normalized_template = template_text.strip() if template_text else None
-    with _get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO request_history (
-                session_id,
-                query,
-                category,
-                subcategory,
-                main_vote,
-                sub_vote,
-                template_text,
-                template_positive,
-                top_item_id
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+    _writer.submit(
+        (
+            _INSERT_REQUEST_HISTORY_SQL,
             (
                 normalized_session,
                 normalized_query,
@@ -447,308 +709,316 @@ def record_request_history(
                 top_item_id,
             ),
         )
-        conn.commit()
+    )
 
 
-def _build_vote_breakdown(total: float, correct: float) -> Dict[str, object]:
-    total_int = int(total)
-    correct_int = int(correct)
-    accuracy = correct_int / total_int if total_int else 0.0
+def _build_vote_breakdown(total: int, correct: int) -> Dict[str, object]:
+    accuracy = correct / total if total else 0.0
     return {
-        "total": total_int,
-        "correct": correct_int,
+        "total": total,
+        "correct": correct,
         "accuracy": accuracy,
     }
 
 
-def fetch_classification_quality(limit_pairs: int = 10) -> Dict[str, object]:
-    with _get_connection() as conn:
-        totals = conn.execute(
-            """
-            SELECT target, SUM(is_correct) AS correct, COUNT(*) AS total
-            FROM classification_votes
-            GROUP BY target
-            """
-        ).fetchall()
+_CLASSIFICATION_VOTE_ROLLUP_SQL = """
+    SELECT
+        target,
+        category,
+        subcategory,
+        COUNT(*) AS total,
+        COALESCE(SUM(is_correct), 0) AS correct
+    FROM classification_votes
+    GROUP BY target, category, subcategory
+"""
 
-        pairs = conn.execute(
-            """
-            SELECT
-                category,
-                subcategory,
-                SUM(CASE WHEN target = 'main' THEN 1 ELSE 0 END) AS main_total,
-                SUM(CASE WHEN target = 'main' AND is_correct = 1 THEN 1 ELSE 0 END) AS main_correct,
-                SUM(CASE WHEN target = 'sub' THEN 1 ELSE 0 END) AS sub_total,
-                SUM(CASE WHEN target = 'sub' AND is_correct = 1 THEN 1 ELSE 0 END) AS sub_correct
-            FROM classification_votes
-            GROUP BY category, subcategory
-            ORDER BY (main_total + sub_total) DESC, category, subcategory
-            LIMIT ?
-            """,
-            (limit_pairs,),
-        ).fetchall()
-
-    overall_main: Tuple[float, float] = (0.0, 0.0)
-    overall_sub: Tuple[float, float] = (0.0, 0.0)
-    for row in totals:
-        target = row["target"]
-        correct = float(row["correct"] or 0.0)
-        total = float(row["total"] or 0.0)
-        if target == "main":
-            overall_main = (total, correct)
-        elif target == "sub":
-            overall_sub = (total, correct)
-
-    pair_list: List[Dict[str, object]] = []
-    for row in pairs:
-        main_total = float(row["main_total"] or 0.0)
-        main_correct = float(row["main_correct"] or 0.0)
-        sub_total = float(row["sub_total"] or 0.0)
-        sub_correct = float(row["sub_correct"] or 0.0)
-        pair_list.append(
-            {
-                "category": row["category"],
-                "subcategory": row["subcategory"],
-                "main": _build_vote_breakdown(main_total, main_correct),
-                "sub": _build_vote_breakdown(sub_total, sub_correct),
-            }
+VoteRollupRow = Tuple[str, Optional[str], Optional[str], int, int]
+
+
+def _fetch_vote_rollup() -> List[VoteRollupRow]:
+    """One pass over classification_votes shared by every vote statistic."""
+    return [
+        tuple(row)
+        for row in _get_connection().execute(_CLASSIFICATION_VOTE_ROLLUP_SQL)
+    ]
+
+
+def _nullable_key(value: Optional[str]) -> Tuple[bool, str]:
+    # Mirrors SQL ordering, where NULL sorts before any string.
+    return (value is not None, value or "")
+
+
+def fetch_classification_quality(
+    limit_pairs: int = 10,
+    *,
+    rollup: Optional[List[VoteRollupRow]] = None,
+) -> Dict[str, object]:
+    if rollup is None:
+        rollup = _fetch_vote_rollup()
+
+    overall: Dict[str, List[int]] = {"main": [0, 0], "sub": [0, 0]}
+    pairs: Dict[Tuple[Optional[str], Optional[str]], Dict[str, List[int]]] = {}
+    for target, category, subcategory, total, correct in rollup:
+        bucket = overall.get(target)
+        if bucket is None:
+            continue
+        bucket[0] += total
+        bucket[1] += correct
+        pair = pairs.setdefault(
+            (category, subcategory), {"main": [0, 0], "sub": [0, 0]}
         )
+        pair[target][0] += total
+        pair[target][1] += correct
+
+    top_pairs = heapq.nsmallest(
+        limit_pairs,
+        pairs.items(),
+        key=lambda item: (
+            -(item[1]["main"][0] + item[1]["sub"][0]),
+            _nullable_key(item[0][0]),
+            _nullable_key(item[0][1]),
+        ),
+    )
+    pair_list: List[Dict[str, object]] = [
+        {
+            "category": category,
+            "subcategory": subcategory,
+            "main": _build_vote_breakdown(*counts["main"]),
+            "sub": _build_vote_breakdown(*counts["sub"]),
+        }
+        for (category, subcategory), counts in top_pairs
+    ]
 
     return {
-        "overall_main": _build_vote_breakdown(*overall_main),
-        "overall_sub": _build_vote_breakdown(*overall_sub),
+        "overall_main": _build_vote_breakdown(*overall["main"]),
+        "overall_sub": _build_vote_breakdown(*overall["sub"]),
         "pairs": pair_list,
     }
 
 
+_TEMPLATE_QUALITY_SQL = """
+    SELECT
+        COUNT(*) AS total,
+        COALESCE(SUM(is_positive), 0) AS positive
+    FROM template_votes
+"""
+
+
 def fetch_template_quality() -> Dict[str, object]:
-    with _get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT
-                SUM(is_positive) AS positive,
-                COUNT(*) AS total
-            FROM template_votes
-            """
-        ).fetchone()
-    total = float(row["total"] or 0.0) if row else 0.0
-    positive = float(row["positive"] or 0.0) if row else 0.0
+    total, positive = _get_connection().execute(_TEMPLATE_QUALITY_SQL).fetchone()
     return _build_feedback_stats(total=total, positive=positive)
 
 
+_TEMPLATE_ACCURACY_SQL = """
+    SELECT
+        COUNT(template_positive) AS total,
+        COALESCE(SUM(template_positive), 0) AS positive
+    FROM request_history
+    WHERE template_positive IS NOT NULL
+"""
+
+
 def fetch_template_accuracy_totals() -> Tuple[int, int]:
     """Return total template answers with feedback and the number marked positive."""
-    with _get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT
-                COUNT(template_positive) AS total,
-                SUM(CASE WHEN template_positive = 1 THEN 1 ELSE 0 END) AS positive
-            FROM request_history
-            WHERE template_positive IS NOT NULL
-            """
-        ).fetchone()
-    total = int(row["total"] or 0)
-    positive = int(row["positive"] or 0)
+    total, positive = _get_connection().execute(_TEMPLATE_ACCURACY_SQL).fetchone()
     return total, positive
 
 
+_TEMPLATE_CATEGORY_STATS_SQL = """
+    SELECT
+        category,
+        subcategory,
+        COUNT(template_positive) AS total,
+        COALESCE(SUM(template_positive), 0) AS positive
+    FROM request_history
+    WHERE category IS NOT NULL
+      AND subcategory IS NOT NULL
+    GROUP BY category, subcategory
+"""
+
+
 def fetch_template_category_stats() -> Dict[Tuple[str, str], Tuple[int, int]]:
     """Return number of template responses and positives per category/subcategory."""
-    with _get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                category,
-                subcategory,
-                COUNT(template_positive) AS total,
-                SUM(CASE WHEN template_positive = 1 THEN 1 ELSE 0 END) AS positive
-            FROM request_history
-            WHERE category IS NOT NULL
-              AND subcategory IS NOT NULL
-            GROUP BY category, subcategory
-            """
-        ).fetchall()
+    rows = _get_connection().execute(_TEMPLATE_CATEGORY_STATS_SQL).fetchall()
 
     stats: Dict[Tuple[str, str], Tuple[int, int]] = {}
-    for row in rows:
-        category = (row["category"] or "").strip()
-        subcategory = (row["subcategory"] or "").strip()
+    for category, subcategory, total, positive in rows:
+        category = category.strip()
+        subcategory = subcategory.strip()
         if not category or not subcategory:
             continue
-        total = int(row["total"] or 0)
-        positive = int(row["positive"] or 0)
         stats[(category, subcategory)] = (total, positive)
     return stats
 
 
-def fetch_operator_vote_totals() -> Tuple[int, int]:
+def fetch_operator_vote_totals(
+    *, rollup: Optional[List[VoteRollupRow]] = None
+) -> Tuple[int, int]:
     """Return total operator classification votes and number marked correct."""
-    with _get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT
-                SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) AS correct,
-                COUNT(*) AS total
-            FROM classification_votes
-            """
-        ).fetchone()
-    total = int(row["total"] or 0) if row else 0
-    correct = int(row["correct"] or 0) if row else 0
+    if rollup is None:
+        rollup = _fetch_vote_rollup()
+    total = sum(row[3] for row in rollup)
+    correct = sum(row[4] for row in rollup)
     return total, correct
 
 
+_MESSAGE_FEEDBACK_TOTALS_SQL = """
+    SELECT
+        COUNT(*) AS total,
+        COALESCE(SUM(useful), 0) AS positive
+    FROM message_feedback
+"""
+
+
 def fetch_message_feedback_totals() -> Tuple[int, int]:
     """Return total client feedback records and positive responses."""
-    with _get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT
-                SUM(CASE WHEN useful = 1 THEN 1 ELSE 0 END) AS positive,
-                COUNT(*) AS total
-            FROM message_feedback
-            """
-        ).fetchone()
-    total = int(row["total"] or 0) if row else 0
-    positive = int(row["positive"] or 0) if row else 0
+    total, positive = _get_connection().execute(_MESSAGE_FEEDBACK_TOTALS_SQL).fetchone()
     return total, positive
 
 
-def fetch_category_accuracy_stats(limit: int = 50) -> List[Dict[str, object]]:
-    """Return accuracy per category based on operator classification votes."""
-    with _get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                category,
-                COUNT(*) AS total,
-                SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) AS correct
-            FROM classification_votes
-            WHERE target = 'main'
-              AND category IS NOT NULL
-              AND TRIM(category) <> ''
-            GROUP BY category
-            ORDER BY total DESC, category
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-
-    stats: List[Dict[str, object]] = []
-    for row in rows:
-        category = (row["category"] or "").strip()
-        if not category:
-            continue
-        total = int(row["total"] or 0)
-        correct = int(row["correct"] or 0)
-        accuracy = correct / total if total else 0.0
-        stats.append(
-            {
-                "category": category,
-                "total": total,
-                "correct": correct,
-                "accuracy": accuracy,
-            }
-        )
-    return stats
+# Each part is a single-row aggregate, so the cross join yields one row with
+# every feedback counter the dashboard needs.
+_FEEDBACK_TOTALS_SQL = f"""
+    SELECT templates.*, template_answers.*, client.*
+    FROM ({_TEMPLATE_QUALITY_SQL}) AS templates,
+         ({_TEMPLATE_ACCURACY_SQL}) AS template_answers,
+         ({_MESSAGE_FEEDBACK_TOTALS_SQL}) AS client
+"""
 
 
-def fetch_subcategory_accuracy_stats(limit: int = 100) -> List[Dict[str, object]]:
-    """Return accuracy per subcategory based on operator classification votes."""
-    with _get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                category,
-                subcategory,
-                COUNT(*) AS total,
-                SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) AS correct
-            FROM classification_votes
-            WHERE target = 'sub'
-              AND category IS NOT NULL
-              AND TRIM(category) <> ''
-              AND subcategory IS NOT NULL
-              AND TRIM(subcategory) <> ''
-            GROUP BY category, subcategory
-            ORDER BY total DESC, category, subcategory
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-
-    stats: List[Dict[str, object]] = []
-    for row in rows:
-        category = (row["category"] or "").strip()
-        subcategory = (row["subcategory"] or "").strip()
-        if not category or not subcategory:
+def fetch_category_accuracy_stats(
+    limit: int = 50,
+    *,
+    rollup: Optional[List[VoteRollupRow]] = None,
+) -> List[Dict[str, object]]:
+    """Return accuracy per category based on operator classification votes."""
+    if rollup is None:
+        rollup = _fetch_vote_rollup()
+
+    grouped: Dict[str, List[int]] = {}
+    for target, category, _, total, correct in rollup:
+        if target != "main" or not category or not category.strip():
             continue
-        total = int(row["total"] or 0)
-        correct = int(row["correct"] or 0)
-        accuracy = correct / total if total else 0.0
-        stats.append(
-            {
-                "category": category,
-                "subcategory": subcategory,
-                "total": total,
-                "correct": correct,
-                "accuracy": accuracy,
-            }
-        )
-    return stats
+        counts = grouped.setdefault(category, [0, 0])
+        counts[0] += total
+        counts[1] += correct
+
+    top = heapq.nsmallest(limit, grouped.items(), key=lambda item: (-item[1][0], item[0]))
+    return [
+        {
+            "category": category.strip(),
+            "total": total,
+            "correct": correct,
+            "accuracy": correct / total if total else 0.0,
+        }
+        for category, (total, correct) in top
+    ]
+
+
+def fetch_subcategory_accuracy_stats(
+    limit: int = 100,
+    *,
+    rollup: Optional[List[VoteRollupRow]] = None,
+) -> List[Dict[str, object]]:
+    """Return accuracy per subcategory based on operator classification votes."""
+    if rollup is None:
+        rollup = _fetch_vote_rollup()
+
+    rows = [
+        (category, subcategory, total, correct)
+        for target, category, subcategory, total, correct in rollup
+        if target == "sub"
+        and category
+        and category.strip()
+        and subcategory
+        and subcategory.strip()
+    ]
+    top = heapq.nsmallest(limit, rows, key=lambda row: (-row[2], row[0], row[1]))
+    return [
+        {
+            "category": category.strip(),
+            "subcategory": subcategory.strip(),
+            "total": total,
+            "correct": correct,
+            "accuracy": correct / total if total else 0.0,
+        }
+        for category, subcategory, total, correct in top
+    ]
+
+
+_REQUEST_HISTORY_SQL = """
+    SELECT
+        id,
+        ts AS timestamp,
+        session_id,
+        query,
+        category,
+        subcategory,
+        main_vote,
+        sub_vote,
+        template_text,
+        template_positive,
+        top_item_id
+    FROM request_history
+    ORDER BY ts DESC, id DESC
+    LIMIT ?
+"""
+
+
+def _optional_bool(value: Optional[int]) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+def _history_row(cursor: sqlite3.Cursor, row: Tuple[object, ...]) -> Dict[str, object]:
+    (
+        row_id,
+        timestamp,
+        session_id,
+        query,
+        category,
+        subcategory,
+        main_vote,
+        sub_vote,
+        template_text,
+        template_positive,
+        top_item_id,
+    ) = row
+    return {
+        "id": row_id,
+        "timestamp": timestamp,
+        "session_id": session_id,
+        "query": query,
+        "category": category,
+        "subcategory": subcategory,
+        "main_vote": _optional_bool(main_vote),
+        "sub_vote": _optional_bool(sub_vote),
+        "template_text": template_text,
+        "template_positive": _optional_bool(template_positive),
+        "top_item_id": top_item_id,
+    }
 
 
 def fetch_request_history(limit: int = 20) -> List[Dict[str, object]]:
-    with _get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                id,
-                ts AS timestamp,
-                session_id,
-                query,
-                category,
-                subcategory,
-                main_vote,
-                sub_vote,
-                template_text,
-                template_positive,
-                top_item_id
-            FROM request_history
-            ORDER BY ts DESC, id DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-
-    history: List[Dict[str, object]] = []
-    for row in rows:
-        timestamp_raw = row["timestamp"]
-        if isinstance(timestamp_raw, str):
-            timestamp = datetime.fromisoformat(timestamp_raw)
-        else:
-            timestamp = timestamp_raw
-        history.append(
-            {
-                "id": int(row["id"]),
-                "timestamp": timestamp,
-                "session_id": row["session_id"],
-                "query": row["query"],
-                "category": row["category"],
-                "subcategory": row["subcategory"],
-                "main_vote": None
-                if row["main_vote"] is None
-                else bool(row["main_vote"]),
-                "sub_vote": None
-                if row["sub_vote"] is None
-                else bool(row["sub_vote"]),
-                "template_text": row["template_text"],
-                "template_positive": None
-                if row["template_positive"] is None
-                else bool(row["template_positive"]),
-                "top_item_id": row["top_item_id"],
-            }
-        )
-    return history
+    return _fetch_rows(_history_row, _REQUEST_HISTORY_SQL, (limit,))
+
+
+_DATA_VERSION_SQL = """
+    SELECT
+        (SELECT MAX(id) FROM events),
+        (SELECT MAX(id) FROM classification_votes),
+        (SELECT MAX(id) FROM template_votes),
+        (SELECT MAX(id) FROM message_feedback),
+        (SELECT MAX(id) FROM request_history)
+"""
+
+SUMMARY_CACHE_TTL_SECONDS = 2.0
+
+SummaryCacheEntry = Tuple[Tuple[object, ...], float, Dict[str, object]]
+_summary_cache: Dict[Tuple[int, int, int], SummaryCacheEntry] = {}
+
+
+def _fetch_data_version() -> Tuple[object, ...]:
+    return tuple(_get_connection().execute(_DATA_VERSION_SQL).fetchone())
 
 
 def fetch_summary(
@@ -757,76 +1027,57 @@ def fetch_summary(
     pair_limit: int = 8,
     history_limit: int = 15,
 ) -> Dict[str, object]:
-    search_total = _fetch_scalar(
-        "SELECT COUNT(*) FROM events WHERE kind = 'search'"
-    )
-    search_success = _fetch_scalar(
-        """
-        SELECT COUNT(*)
-        FROM events
-        WHERE kind = 'search'
-          AND json_extract(payload, '$.result_count') > 0
-        """
-    )
-    search_latency = _fetch_scalar(
-        "SELECT AVG(latency_ms) FROM events WHERE kind = 'search'"
-    )
-    search_score = _fetch_scalar(
-        """
-        SELECT AVG(json_extract(payload, '$.top_score'))
-        FROM events
-        WHERE kind = 'search'
-          AND json_extract(payload, '$.top_score') IS NOT NULL
-        """
-    )
+    """Return the dashboard summary, reusing the last one while no rows were added."""
+    flush_now()
+    key = (limit_recent, pair_limit, history_limit)
+    with _read_transaction():
+        version = _fetch_data_version()
+        now = time.monotonic()
+        cached = _summary_cache.get(key)
+        if cached is not None and cached[0] == version and now < cached[1]:
+            return cached[2]
+        summary = _build_summary(
+            limit_recent, pair_limit=pair_limit, history_limit=history_limit
+        )
+    _summary_cache[key] = (version, now + SUMMARY_CACHE_TTL_SECONDS, summary)
+    return summary
 
-    classify_total = _fetch_scalar(
-        "SELECT COUNT(*) FROM events WHERE kind = 'classify'"
-    )
-    classify_success = _fetch_scalar(
-        """
-        SELECT COUNT(*)
-        FROM events
-        WHERE kind = 'classify'
-          AND json_extract(payload, '$.confidence') >= 0.5
-        """
-    )
-    classify_latency = _fetch_scalar(
-        "SELECT AVG(latency_ms) FROM events WHERE kind = 'classify'"
-    )
-    classify_score = _fetch_scalar(
-        """
-        SELECT AVG(json_extract(payload, '$.confidence'))
-        FROM events
-        WHERE kind = 'classify'
-          AND json_extract(payload, '$.confidence') IS NOT NULL
-        """
-    )
 
-    feedback_total = _fetch_scalar(
-        "SELECT COUNT(*) FROM events WHERE kind = 'feedback'"
-    )
-    feedback_positive = _fetch_scalar(
-        """
-        SELECT COUNT(*)
-        FROM events
-        WHERE kind = 'feedback'
-          AND json_extract(payload, '$.useful') = 1
-        """
-    )
+def _build_summary(
+    limit_recent: int,
+    *,
+    pair_limit: int,
+    history_limit: int,
+) -> Dict[str, object]:
+    totals = _fetch_event_totals()
+    search_total, search_success, search_latency, search_score = totals["search"]
+    classify_total, classify_success, classify_latency, classify_score = totals["classify"]
+    feedback_total, feedback_positive, _, _ = totals["feedback"]
 
     recent_events = _fetch_recent(limit_recent)
+    vote_rollup = _fetch_vote_rollup()
+    (
+        template_vote_total,
+        template_vote_positive,
+        template_total,
+        template_positive,
+        client_total,
+        client_positive,
+    ) = _get_connection().execute(_FEEDBACK_TOTALS_SQL).fetchone()
 
     quality = {
-        "classification": fetch_classification_quality(limit_pairs=pair_limit),
-        "templates": fetch_template_quality(),
+        "classification": fetch_classification_quality(
+            limit_pairs=pair_limit, rollup=vote_rollup
+        ),
+        "templates": _build_feedback_stats(
+            total=template_vote_total, positive=template_vote_positive
+        ),
     }
 
     classification_quality = quality["classification"]
     main_overall = classification_quality["overall_main"]
     sub_overall = classification_quality["overall_sub"]
 
-    template_total, template_positive = fetch_template_accuracy_totals()
     template_accuracy = (
         template_positive / template_total if template_total else 0.0
     )
@@ -841,8 +1092,7 @@ def fetch_summary(
         "sub": sub_overall,
     }
 
-    operator_total, operator_correct = fetch_operator_vote_totals()
-    client_total, client_positive = fetch_message_feedback_totals()
+    operator_total, operator_correct = fetch_operator_vote_totals(rollup=vote_rollup)
 
     analytics_overview = {
         "operator": {
@@ -857,8 +1107,8 @@ def fetch_summary(
         },
     }
 
-    category_stats = fetch_category_accuracy_stats()
-    subcategory_stats = fetch_subcategory_accuracy_stats()
+    category_stats = fetch_category_accuracy_stats(rollup=vote_rollup)
+    subcategory_stats = fetch_subcategory_accuracy_stats(rollup=vote_rollup)
 
     history = fetch_request_history(limit=history_limit)
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Tuple
 
 from simplemma import lemmatize, simple_tokenizer
@@ -7,13 +8,16 @@ from simplemma import lemmatize, simple_tokenizer
 LEMMA_LANGS: Tuple[str, ...] = ("ru", "en")
 
 
+@lru_cache(maxsize=100_000)
+def _lemma(token: str) -> str:
+    return lemmatize(token, LEMMA_LANGS) or token
+
+
+@lru_cache(maxsize=10_000)
 def normalize_text(value: str) -> str:
-    
+
     if not value:
         return ""
-    tokens = [token for token in simple_tokenizer(value.lower()) if token.strip()]
-    if not tokens:
-        return ""
-    lemmas = [lemmatize(token, LEMMA_LANGS) or token for token in tokens]
-    return " ".join(lemmas)
-
+    return " ".join(
+        _lemma(token) for token in simple_tokenizer(value.lower()) if token.strip()
+    )
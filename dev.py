@@ -1,23 +1,24 @@
 from __future__ import annotations
 
-import asyncio
-import struct
+import mimetypes
+import os
+import posixpath
+import stat
 import sys
 import threading
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import urlsplit, urlunsplit
 
-from hypercorn.asyncio import serve
-from hypercorn.config import Config
-
-from backend.api import app as backend_app
+import uvicorn
 
 BACKEND_HOST = "127.0.0.1"
 BACKEND_PORT = 8000
 FRONTEND_HOST = "127.0.0.1"
 FRONTEND_PORT = 3000
+STATIC_WORKERS = int(os.environ.get("DEV_STATIC_WORKERS", "8"))
 PROJECT_ROOT = Path(__file__).parent.resolve()
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 SUPPORT_HOST = "127.0.0.1"
@@ -28,43 +29,43 @@ SUPPORT_DIR = FRONTEND_DIR
 CLIENT_DIR = FRONTEND_DIR / "client"
 
 
-def _generate_favicon() -> bytes:
-    
-    width = height = 16
-    color = bytes([0xF2, 0x77, 0x18, 0xFF])  
-    xor_bitmap = color * (width * height)
-    and_mask = b"\x00" * (((width + 31) // 32) * 4 * height)
-    image_size = 40 + len(xor_bitmap) + len(and_mask)
-    header = struct.pack("<HHH", 0, 1, 1)
-    entry = struct.pack(
-        "<BBBBHHII",
-        width if width < 256 else 0,
-        height if height < 256 else 0,
-        0,
-        0,
-        1,
-        32,
-        image_size,
-        22,
-    )
-    bitmap_header = struct.pack(
-        "<IIIHHIIIIII",
-        40,
-        width,
-        height * 2,
-        1,
-        32,
-        0,
-        len(xor_bitmap),
-        2835,
-        2835,
-        0,
-        0,
-    )
-    return header + entry + bitmap_header + xor_bitmap + and_mask
-
-
-FAVICON_BYTES = _generate_favicon()
+# 16x16 32-bit .ico: ICONDIR, one ICONDIRENTRY, BITMAPINFOHEADER, 256 BGRA
+# pixels of the accent colour and an empty AND mask. The whole expression is
+# folded into a single bytes constant at compile time.
+FAVICON_BYTES = (
+    b"\x00\x00\x01\x00\x01\x00"
+    b"\x10\x10\x00\x00\x01\x00\x20\x00\x68\x04\x00\x00\x16\x00\x00\x00"
+    b"\x28\x00\x00\x00\x10\x00\x00\x00\x20\x00\x00\x00\x01\x00\x20\x00"
+    b"\x00\x00\x00\x00\x00\x04\x00\x00\x13\x0b\x00\x00\x13\x0b\x00\x00"
+    b"\x00\x00\x00\x00\x00\x00\x00\x00"
+    + b"\xf2\x77\x18\xff" * 256
+    + b"\x00" * 64
+)
+_FAVICON_VIEW = memoryview(FAVICON_BYTES)
+# Everything after the per-request status line, Server and Date headers.
+_FAVICON_RESPONSE_TAIL = (
+    "Content-Type: image/x-icon\r\n"
+    "Cache-Control: public, max-age=86400\r\n"
+    f"Content-Length: {len(FAVICON_BYTES)}\r\n"
+    "\r\n"
+).encode("latin-1")
+
+# Absolute file path -> (mtime_ns, size, body). Entries are revalidated with a
+# single stat() per request, so edits under frontend/ show up immediately.
+_FILE_CACHE: dict[str, tuple[int, int, bytes]] = {}
+
+
+@lru_cache(maxsize=256)
+def _mime_for(ext: str) -> str:
+    # Same lookup order as SimpleHTTPRequestHandler.guess_type, keyed by suffix.
+    extensions_map = SimpleHTTPRequestHandler.extensions_map
+    if ext in extensions_map:
+        return extensions_map[ext]
+    lowered = ext.lower()
+    if lowered in extensions_map:
+        return extensions_map[lowered]
+    guess, _ = mimetypes.guess_type(f"file{lowered}")
+    return guess or "application/octet-stream"
 
 
 class StaticHandler(SimpleHTTPRequestHandler):
@@ -77,27 +78,59 @@ class StaticHandler(SimpleHTTPRequestHandler):
 
     def do_GET(self) -> None:  # type: ignore[override]
         self._ensure_default_page()
-        if self._serve_generated_favicon():
+        if self._serve_generated_favicon() or self._serve_cached_file():
             return
         super().do_GET()
 
     def do_HEAD(self) -> None:  # type: ignore[override]
         self._ensure_default_page()
-        if self._serve_generated_favicon():
+        if self._serve_generated_favicon() or self._serve_cached_file():
             return
         super().do_HEAD()
 
+    def guess_type(self, path: str) -> str:  # type: ignore[override]
+        return _mime_for(posixpath.splitext(path)[1])
+
     def _serve_generated_favicon(self) -> bool:
         parsed = urlsplit(self.path)
         if parsed.path != "/favicon.ico":
             return False
+        self.log_request(200)
+        head = (
+            f"{self.protocol_version} 200 OK\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+        )
+        self.wfile.write(head.encode("latin-1") + _FAVICON_RESPONSE_TAIL)
+        if self.command != "HEAD":
+            self.wfile.write(_FAVICON_VIEW)
+        return True
+
+    def _serve_cached_file(self) -> bool:
+        if "If-Modified-Since" in self.headers:
+            return False
+        path = self.translate_path(self.path)
+        try:
+            info = os.stat(path)
+        except OSError:
+            return False
+        if not stat.S_ISREG(info.st_mode):
+            return False
+        cached = _FILE_CACHE.get(path)
+        if cached is None or cached[0] != info.st_mtime_ns or cached[1] != info.st_size:
+            try:
+                body = Path(path).read_bytes()
+            except OSError:
+                return False
+            cached = _FILE_CACHE[path] = (info.st_mtime_ns, info.st_size, body)
+        body = cached[2]
         self.send_response(200)
-        self.send_header("Content-Type", "image/x-icon")
-        self.send_header("Cache-Control", "public, max-age=86400")
-        self.send_header("Content-Length", str(len(FAVICON_BYTES)))
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", self.date_time_string(info.st_mtime))
         self.end_headers()
         if self.command != "HEAD":
-            self.wfile.write(FAVICON_BYTES)
+            self.wfile.write(body)
         return True
 
     def _ensure_default_page(self) -> None:
@@ -112,24 +145,45 @@ class StaticHandler(SimpleHTTPRequestHandler):
         print(f"[frontend] {self.log_date_time_string()} {message}")
 
 
-async def _serve_backend() -> None:
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that reuses a fixed set of worker threads."""
+
+    def __init__(self, *args, max_workers: int = STATIC_WORKERS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="static")
+
+    def process_request(self, request, client_address) -> None:  # type: ignore[override]
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _serve_backend() -> None:
     
-    config = Config()
-    config.bind = [f"{BACKEND_HOST}:{BACKEND_PORT}"]
-    config.reload = True
-    config.workers = 1
     print(f"[backend] Listening on http://{BACKEND_HOST}:{BACKEND_PORT} (reload enabled)")
-    await serve(backend_app, config)
+    # "auto" resolves to uvloop/httptools from uvicorn[standard] and falls back
+    # to asyncio/h11 where they are unavailable (uvloop has no Windows build).
+    uvicorn.run(
+        "backend.api:app",
+        host=BACKEND_HOST,
+        port=BACKEND_PORT,
+        reload=True,
+        reload_dirs=[str(PROJECT_ROOT / "backend")],
+        loop="auto",
+        http="auto",
+    )
 
 
-def _serve_static(label: str, host: str, port: int, directory: Path, default_file: str) -> ThreadingHTTPServer:
+def _serve_static(label: str, host: str, port: int, directory: Path, default_file: str) -> PooledHTTPServer:
     
     if not directory.exists():
         print(f"{label} directory not found at {directory}", file=sys.stderr)
         sys.exit(1)
 
     handler = partial(StaticHandler, directory=str(directory), default_file=default_file)
-    server = ThreadingHTTPServer((host, port), handler)
+    server = PooledHTTPServer((host, port), handler)
     thread = threading.Thread(target=server.serve_forever, name="frontend-server", daemon=True)
     thread.start()
     print(f"[{label}] Serving {directory} on http://{host}:{port}")
@@ -141,7 +195,7 @@ def main() -> None:
     support_server = _serve_static("support-ui", SUPPORT_HOST, SUPPORT_PORT, SUPPORT_DIR, "index_clean.html")
     client_server = _serve_static("client-ui", CLIENT_HOST, CLIENT_PORT, CLIENT_DIR, "index.html")
     try:
-        asyncio.run(_serve_backend())
+        _serve_backend()
     except KeyboardInterrupt:
         print("\nStopping development servers...")
     finally:
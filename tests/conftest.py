@@ -0,0 +1,117 @@
+import os
+import threading
+
+import httpx
+import pytest
+import pytest_asyncio
+
+os.environ.setdefault("SCIBOX_API_KEY", "test-key")
+os.environ.setdefault("SCIBOX_BASE_URL", "http://dummy.local")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_storage(tmp_path_factory):
+    # Importing backend.services.logic opens the stats and chat databases, so
+    # the paths are redirected before the first import of the application.
+    data_dir = tmp_path_factory.mktemp("data")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("CHAT_DB_PATH", str(data_dir / "chat.db"))
+
+        from backend import settings, storage
+
+        settings.get_settings.cache_clear()
+        monkeypatch.setattr(storage, "STATS_DB_PATH", data_dir / "stats.db")
+        monkeypatch.setattr(storage, "_local", threading.local())
+
+        from backend.services import logic
+
+        monkeypatch.setattr(logic, "FEEDBACK_PATH", data_dir / "feedback.jsonl")
+        yield data_dir
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _stub_logic(_isolated_storage):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("backend.services.logic.perform_warmup", lambda: None)
+
+        sample_result = [
+            {
+                "id": 1,
+                "question": "Как оплатить счёт?",
+                "answer": "Используйте личный кабинет для оплаты счёта.",
+                "title": "Как оплатить счёт?",
+                "category": "Биллинг",
+                "subcategory": "Счета",
+                "score": 0.98,
+            }
+        ]
+
+        monkeypatch.setattr(
+            "backend.services.logic.semantic_search",
+            lambda query, top_k=5, products=None: sample_result,
+        )
+
+        def fake_classify_and_ner(text):
+            return {
+                "category": "Биллинг",
+                "subcategory": "Счета",
+                "category_confidence": 0.91,
+                "subcategory_confidence": 0.87,
+                "confidence": 0.87,
+                "entities": {"problem": "оплата"},
+            }
+
+        monkeypatch.setattr(
+            "backend.services.logic.classify_and_ner",
+            fake_classify_and_ner,
+        )
+
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_logic_state(_isolated_storage, monkeypatch):
+    from backend import storage
+    from backend.services import logic
+
+    for cache in (
+        logic.exact_search_cache,
+        logic.exact_classify_cache,
+        logic.search_cache,
+        logic.classify_cache,
+    ):
+        cache.clear()
+    storage._summary_cache.clear()
+    monkeypatch.setattr(
+        logic,
+        "rate_limiter",
+        logic.RateLimiter(
+            max_requests=logic.settings.rate_limit_max_requests,
+            window_seconds=logic.settings.rate_limit_window_seconds,
+        ),
+    )
+    monkeypatch.setattr(
+        logic,
+        "concurrent_limiter",
+        logic.ConcurrentLimiter(logic.settings.rate_limit_max_inflight),
+    )
+    yield
+    storage.flush_now(timeout=None)
+    logic.feedback_writer.flush()
+
+
+@pytest.fixture(scope="session")
+def app(_stub_logic):
+    from backend.api import app
+
+    return app
+
+
+@pytest_asyncio.fixture
+async def client(app):
+    # ASGITransport skips startup events; the only one is the stubbed warmup.
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as test_client:
+        yield test_client
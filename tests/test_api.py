@@ -1,95 +1,96 @@
-import os
+import asyncio
 
 import pytest
-from fastapi.testclient import TestClient
 
-os.environ.setdefault("SCIBOX_API_KEY", "test-key")
-os.environ.setdefault("SCIBOX_BASE_URL", "http://dummy.local")
 
-
-@pytest.fixture
-def client(monkeypatch):
-    from backend import settings
-    from backend.api import app
-
-    settings.get_settings.cache_clear()
-
-    monkeypatch.setattr("backend.services.logic.perform_warmup", lambda: None)
-
-    sample_result = [
-        {
-            "id": 1,
-            "question": "Как оплатить счёт?",
-            "answer": "Используйте личный кабинет для оплаты счёта.",
-            "title": "Как оплатить счёт?",
-            "category": "Биллинг",
-            "subcategory": "Счета",
-            "score": 0.98,
-        }
-    ]
-
-    monkeypatch.setattr(
-        "backend.services.logic.semantic_search",
-        lambda query, top_k=5: sample_result,
-    )
-
-    def fake_classify_and_ner(text):
-        return {
-            "category": "Биллинг",
-            "subcategory": "Счета",
-            "category_confidence": 0.91,
-            "subcategory_confidence": 0.87,
-            "confidence": 0.87,
-            "entities": {"problem": "оплата"},
-        }
-
-    monkeypatch.setattr(
-        "backend.services.logic.classify_and_ner",
-        fake_classify_and_ner,
-    )
-
-    with TestClient(app) as test_client:
-        yield test_client
-
-
-def test_search_endpoint(client):
-    response = client.post(
+async def _search(client, query, session_id):
+    response = await client.post(
         "/api/search",
-        json={"query": "как оплатить", "top_k": 3, "session_id": "session-1"},
+        json={"query": query, "top_k": 3, "session_id": session_id},
     )
     assert response.status_code == 200
-    payload = response.json()
-    assert payload["results"]
-    assert payload["results"][0]["title"] == "Как оплатить счёт?"
+    return response.json()
 
 
-def test_classify_endpoint(client):
-    response = client.post(
+async def _classify(client, text, session_id):
+    response = await client.post(
         "/api/classify",
-        json={"text": "Мне нужен счёт", "session_id": "session-2"},
+        json={"text": text, "session_id": session_id},
     )
     assert response.status_code == 200
-    payload = response.json()
-    assert payload["label"]
-    assert payload["raw"]["category"] == "Биллинг"
+    return response.json()
 
 
-def test_feedback_and_stats(client):
-    feedback_response = client.post(
+async def _send_feedback(client, session_id):
+    response = await client.post(
         "/api/feedback",
         json={
             "query": "как оплатить",
             "item_id": 1,
             "useful": True,
-            "session_id": "session-3",
+            "session_id": session_id,
         },
     )
-    assert feedback_response.status_code == 200
-    assert feedback_response.json()["ok"] is True
+    assert response.status_code == 200
+    return response.json()
+
+
+async def _stats_summary(client):
+    response = await client.get("/api/stats/summary")
+    assert response.status_code == 200
+    return response.json()
 
-    stats_response = client.get("/api/stats/summary")
-    assert stats_response.status_code == 200
-    summary = stats_response.json()
+
+@pytest.mark.asyncio
+async def test_search_endpoint(client):
+    payload = await _search(client, "как оплатить", "session-1")
+    assert payload["results"]
+    assert payload["results"][0]["title"] == "Как оплатить счёт?"
+
+
+@pytest.mark.asyncio
+async def test_classify_endpoint(client):
+    payload = await _classify(client, "Мне нужен счёт", "session-2")
+    assert payload["label"]
+    assert payload["raw"]["category"] == "Биллинг"
+
+
+@pytest.mark.asyncio
+async def test_feedback_and_stats(client):
+    assert (await _send_feedback(client, "session-3"))["ok"] is True
+
+    summary = await _stats_summary(client)
     assert "search" in summary
     assert "classify" in summary
     assert "feedback" in summary
+
+
+@pytest.mark.asyncio
+async def test_endpoints_concurrently(client, monkeypatch):
+    from backend.services import logic
+
+    stub = logic.semantic_search
+    searched = []
+
+    def counting_search(query, top_k=5, products=None):
+        searched.append(query)
+        return stub(query, top_k=top_k, products=products)
+
+    # conftest clears the result caches before each test, so every distinct
+    # query below has to reach the search backend.
+    monkeypatch.setattr(logic, "semantic_search", counting_search)
+    queries = [f"как оплатить счёт {n}" for n in range(4)]
+
+    results = await asyncio.gather(
+        *(_search(client, query, f"search-{n}") for n, query in enumerate(queries)),
+        _classify(client, "Мне нужен счёт", "classify"),
+        _send_feedback(client, "feedback"),
+    )
+
+    *search_payloads, classify_payload, feedback_payload = results
+    assert sorted(searched) == sorted(queries)
+    for payload in search_payloads:
+        assert payload["results"][0]["title"] == "Как оплатить счёт?"
+    assert classify_payload["raw"]["category"] == "Биллинг"
+    assert feedback_payload["ok"] is True
+    assert "search" in await _stats_summary(client)
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from backend import background
+from backend.background import BatchWriter
+
+
+class RecordingSink:
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+        self.called = threading.Event()
+
+    def __call__(self, batch):
+        self.threads.add(threading.current_thread().name)
+        self.batches.append(list(batch))
+        self.called.set()
+
+    @property
+    def items(self):
+        return [item for batch in self.batches for item in batch]
+
+
+def test_items_submitted_together_are_written_as_one_batch():
+    sink = RecordingSink()
+    writer = BatchWriter(sink, name="test-coalesce", max_batch=100, max_delay=0.2)
+
+    for item in range(50):
+        writer.submit(item)
+
+    assert writer.flush(timeout=5)
+    assert sink.batches == [list(range(50))]
+    assert sink.threads == {"test-coalesce"}
+
+
+def test_batch_is_written_after_max_delay():
+    sink = RecordingSink()
+    writer = BatchWriter(sink, name="test-deadline", max_batch=100, max_delay=0.1)
+
+    started = time.monotonic()
+    writer.submit("only")
+
+    assert sink.called.wait(5)
+    assert time.monotonic() - started >= 0.1
+    assert sink.batches == [["only"]]
+
+
+def test_full_batch_is_written_before_max_delay():
+    sink = RecordingSink()
+    writer = BatchWriter(sink, name="test-max-batch", max_batch=3, max_delay=30)
+
+    for item in range(3):
+        writer.submit(item)
+
+    assert sink.called.wait(5)
+    assert sink.batches == [[0, 1, 2]]
+
+
+def test_full_queue_drops_items_without_writing_on_caller():
+    release = threading.Event()
+    entered = threading.Event()
+    written = []
+
+    def blocking_sink(batch):
+        entered.set()
+        release.wait(5)
+        written.extend(batch)
+
+    writer = BatchWriter(
+        blocking_sink, name="test-overflow", max_batch=1, max_delay=0, max_queue=2
+    )
+    writer.submit(0)
+    assert entered.wait(5)
+
+    for item in (1, 2, 3, 4):
+        writer.submit(item)
+
+    assert writer.dropped == 2
+    assert written == []
+    release.set()
+    assert writer.flush(timeout=5)
+    assert written == [0, 1, 2]
+
+
+def test_flush_waits_only_for_items_submitted_before_it():
+    sink = RecordingSink()
+    writer = BatchWriter(sink, name="test-flush", max_batch=1000, max_delay=0.05)
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            writer.submit("later")
+
+    writer.submit("first")
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        assert writer.flush(timeout=5)
+        assert sink.items[0] == "first"
+    finally:
+        stop.set()
+        producer.join()
+
+
+def test_flush_times_out_while_sink_is_blocked():
+    release = threading.Event()
+    writer = BatchWriter(
+        lambda batch: release.wait(5), name="test-flush-timeout", max_delay=0
+    )
+    writer.submit("stuck")
+
+    try:
+        assert writer.flush(timeout=0.05) is False
+    finally:
+        release.set()
+    assert writer.flush(timeout=5)
+
+
+def test_flush_before_first_submit_returns_immediately():
+    writer = BatchWriter(RecordingSink(), name="test-idle")
+
+    assert writer.flush(timeout=0) is True
+
+
+def test_pending_items_are_drained_at_exit(monkeypatch):
+    exit_hooks = []
+    monkeypatch.setattr(background.atexit, "register", exit_hooks.append)
+    sink = RecordingSink()
+    writer = BatchWriter(sink, name="test-atexit", max_batch=100, max_delay=30)
+
+    for item in range(5):
+        writer.submit(item)
+    assert sink.batches == []
+
+    assert exit_hooks == [writer.flush]
+    for hook in exit_hooks:
+        hook()
+    assert sink.items == [0, 1, 2, 3, 4]
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+from contextlib import ExitStack
+
+import pytest
+from fastapi import HTTPException
+
+from backend.models import SearchRequest
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def logic():
+    from backend.services import logic
+
+    return logic
+
+
+@pytest.fixture
+def clock(logic, monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(logic, "time", fake)
+    return fake
+
+
+def test_rate_limiter_denies_after_max_requests_in_window(logic, clock):
+    limiter = logic.RateLimiter(max_requests=3, window_seconds=10)
+
+    assert [limiter.check("k") for _ in range(4)] == [True, True, True, False]
+    assert limiter.check(None) is True
+    assert limiter.check("other") is True
+
+
+def test_rate_limiter_window_rolls_over_slot_by_slot(logic, clock):
+    limiter = logic.RateLimiter(max_requests=2, window_seconds=10)
+
+    assert limiter.check("k")
+    clock.now = 1001.0
+    assert limiter.check("k")
+
+    clock.now = 1009.99
+    assert not limiter.check("k")
+
+    # The slot of the first request leaves the window; the second still counts.
+    clock.now = 1010.0
+    assert limiter.check("k")
+    assert not limiter.check("k")
+
+    clock.now = 1011.0
+    assert limiter.check("k")
+
+
+def test_rate_limiter_denied_requests_do_not_consume_slots(logic, clock):
+    limiter = logic.RateLimiter(max_requests=1, window_seconds=10)
+
+    assert limiter.check("k")
+    clock.now = 1005.0
+    assert not any(limiter.check("k") for _ in range(5))
+
+    clock.now = 1010.0
+    assert limiter.check("k")
+
+
+def _keys_in_shard(limiter, shard, count):
+    mask = limiter.SHARD_COUNT - 1
+    keys = (f"key-{n}" for n in range(100_000))
+    return [key for key in keys if hash(key) & mask == shard][:count]
+
+
+def _shard_keys(limiter, shard):
+    _, store = limiter._shards[shard]
+    return list(store)
+
+
+def test_rate_limiter_places_keys_by_hash_mask(logic, clock):
+    limiter = logic.RateLimiter(max_requests=5, window_seconds=10)
+    first, second = _keys_in_shard(limiter, 3, 1) + _keys_in_shard(limiter, 11, 1)
+
+    limiter.check(first)
+    limiter.check(second)
+
+    assert _shard_keys(limiter, 3) == [first]
+    assert _shard_keys(limiter, 11) == [second]
+
+
+def test_rate_limiter_evicts_least_recently_used_key_over_shard_cap(logic, clock):
+    limiter = logic.RateLimiter(
+        max_requests=1, window_seconds=10, max_keys=2 * logic.RateLimiter.SHARD_COUNT
+    )
+    a, b, c = _keys_in_shard(limiter, 0, 3)
+    (outsider,) = _keys_in_shard(limiter, 1, 1)
+
+    limiter.check(outsider)
+    limiter.check(a)
+    limiter.check(b)
+    limiter.check(a)  # denied, but refreshes a's position
+    limiter.check(c)
+
+    assert _shard_keys(limiter, 0) == [a, c]
+    assert _shard_keys(limiter, 1) == [outsider]
+    # b lost its counters with the eviction, so it starts a fresh window.
+    assert limiter.check(b)
+
+
+def test_rate_limiter_drops_keys_idle_past_the_window(logic, clock):
+    limiter = logic.RateLimiter(max_requests=1, window_seconds=10)
+    idle, recent, newcomer = _keys_in_shard(limiter, 5, 3)
+
+    limiter.check(idle)
+    clock.now = 1005.0
+    limiter.check(recent)
+
+    clock.now = 1010.0
+    limiter.check(newcomer)
+
+    assert _shard_keys(limiter, 5) == [recent, newcomer]
+    assert not limiter.check(recent)
+
+
+def _inflight(limiter):
+    return sum(sum(inflight.values()) for _, inflight in limiter._shards)
+
+
+def _search_request(session_id):
+    return SearchRequest(query="как оплатить", session_id=session_id)
+
+
+def test_limit_concurrency_raises_429_at_max_inflight(logic, monkeypatch):
+    limiter = logic.ConcurrentLimiter(2)
+    monkeypatch.setattr(logic, "concurrent_limiter", limiter)
+
+    with ExitStack() as stack:
+        stack.enter_context(logic._limit_concurrency("k"))
+        stack.enter_context(logic._limit_concurrency("k"))
+        with pytest.raises(HTTPException) as excinfo:
+            stack.enter_context(logic._limit_concurrency("k"))
+        assert excinfo.value.status_code == 429
+        with logic._limit_concurrency("other"):
+            assert _inflight(limiter) == 3
+
+    assert _inflight(limiter) == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_releases_slot_when_it_raises(logic, monkeypatch):
+    limiter = logic.ConcurrentLimiter(1)
+    monkeypatch.setattr(logic, "concurrent_limiter", limiter)
+
+    def failing_search(query, top_k=5, products=None):
+        raise RuntimeError("search backend down")
+
+    monkeypatch.setattr(logic, "semantic_search", failing_search)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await logic.handle_search(
+                _search_request("s"), client_ip=None, user_agent=None
+            )
+        assert _inflight(limiter) == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_releases_slot_when_cancelled(logic, monkeypatch):
+    limiter = logic.ConcurrentLimiter(1)
+    monkeypatch.setattr(logic, "concurrent_limiter", limiter)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def blocking_search(query, top_k=5, products=None):
+        entered.set()
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(logic, "semantic_search", blocking_search)
+
+    task = asyncio.ensure_future(
+        logic.handle_search(_search_request("s"), client_ip=None, user_agent=None)
+    )
+    try:
+        assert await asyncio.to_thread(entered.wait, 5)
+        assert _inflight(limiter) == 1
+        with pytest.raises(HTTPException) as excinfo:
+            await logic.handle_search(
+                _search_request("s"), client_ip=None, user_agent=None
+            )
+        assert excinfo.value.status_code == 429
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert _inflight(limiter) == 0
+    finally:
+        release.set()
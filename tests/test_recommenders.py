@@ -0,0 +1,51 @@
+import timeit
+
+import numpy as np
+
+from backend.recommenders import _quantize_embeddings, _score_rows
+
+
+def _normalized_matrix(rows, dims, seed=0):
+    matrix = (
+        np.random.default_rng(seed).standard_normal((rows, dims)).astype(np.float32)
+    )
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_int8_scores_are_computed_in_blocks_without_changing_results():
+    matrix = _normalized_matrix(1000, 64)
+    quantized, scales = _quantize_embeddings(matrix, "int8")
+    rows = np.random.default_rng(1).permutation(1000)[:700]
+    query = matrix[rows[0]]
+
+    scores = _score_rows(quantized, scales, rows, query)
+
+    expected = (quantized[rows].astype(np.float32) @ query) * scales[rows]
+    np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(scores, matrix[rows] @ query, atol=0.02)
+    assert quantized.dtype == np.int8
+    assert int(np.argmax(scores)) == 0
+
+
+def test_float16_precision_keeps_a_float32_matrix():
+    matrix = _normalized_matrix(10, 8)
+
+    rounded, scales = _quantize_embeddings(matrix, "float16")
+
+    assert rounded.dtype == np.float32 and scales is None
+    np.testing.assert_array_equal(rounded, matrix.astype(np.float16))
+
+
+def test_quantized_scoring_is_not_slower_than_float32():
+    matrix = _normalized_matrix(8192, 1024)
+    rows = np.arange(len(matrix))
+    query = matrix[0]
+
+    def best_time(precision):
+        prepared, scales = _quantize_embeddings(matrix, precision)
+        timer = timeit.Timer(lambda: _score_rows(prepared, scales, rows, query))
+        return min(timer.repeat(repeat=7, number=3))
+
+    baseline = best_time("float32")
+    for precision in ("int8", "float16"):
+        assert best_time(precision) <= baseline * 1.2, precision
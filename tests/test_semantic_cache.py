@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from backend.services import semantic_cache
+from backend.services.semantic_cache import ExactMatchCache, SemanticCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(semantic_cache, "time", fake)
+    return fake
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_semantic_cache_hits_only_above_threshold(clock):
+    cache = SemanticCache(threshold=0.95, ttl_seconds=60)
+    cache.put(unit(1, 0, 0), "scope", "stored")
+
+    assert cache.get(unit(1, 0.1, 0), "scope") == "stored"  # cosine ~0.995
+    assert cache.get(unit(1, 0.5, 0), "scope") is None  # cosine ~0.894
+    assert cache.get(unit(0, 1, 0), "scope") is None
+
+
+def test_semantic_cache_prefers_the_most_similar_entry(clock):
+    cache = SemanticCache(threshold=0.9, ttl_seconds=60)
+    cache.put(unit(1, 0.3, 0), "scope", "farther")
+    cache.put(unit(1, 0.05, 0), "scope", "closer")
+
+    assert cache.get(unit(1, 0, 0), "scope") == "closer"
+
+
+def test_semantic_cache_isolates_scopes(clock):
+    cache = SemanticCache(threshold=0.95, ttl_seconds=60)
+    cache.put(unit(1, 0, 0), ("search", 3, ()), "top-3")
+
+    assert cache.get(unit(1, 0, 0), ("search", 5, ())) is None
+    cache.put(unit(1, 0, 0), ("search", 5, ()), "top-5")
+    assert cache.get(unit(1, 0, 0), ("search", 3, ())) == "top-3"
+    assert cache.get(unit(1, 0, 0), ("search", 5, ())) == "top-5"
+
+
+def test_semantic_cache_entries_expire_after_ttl(clock):
+    cache = SemanticCache(threshold=0.95, ttl_seconds=30)
+    cache.put(unit(1, 0, 0), "scope", "stored")
+
+    clock.now = 1029.9
+    assert cache.get(unit(1, 0, 0), "scope") == "stored"
+    clock.now = 1030.0
+    assert cache.get(unit(1, 0, 0), "scope") is None
+
+
+def test_semantic_cache_ring_buffer_evicts_oldest_on_wrap(clock):
+    cache = SemanticCache(threshold=0.99, ttl_seconds=60, max_entries=2)
+    first, second, third = unit(1, 0, 0), unit(0, 1, 0), unit(0, 0, 1)
+    cache.put(first, "scope", "first")
+    cache.put(second, "scope", "second")
+    cache.put(third, "scope", "third")
+
+    assert cache.get(first, "scope") is None
+    assert cache.get(second, "scope") == "second"
+    assert cache.get(third, "scope") == "third"
+
+
+def test_semantic_cache_resets_when_embedding_dimension_changes(clock):
+    cache = SemanticCache(threshold=0.95, ttl_seconds=60)
+    cache.put(unit(1, 0, 0), "scope", "3d")
+    cache.put(unit(1, 0, 0, 0), "scope", "4d")
+
+    assert cache.get(unit(1, 0, 0, 0), "scope") == "4d"
+    assert cache.get(unit(0, 1, 0, 0), "scope") is None
+
+
+def test_semantic_cache_clear_drops_everything(clock):
+    cache = SemanticCache(threshold=0.95, ttl_seconds=60)
+    cache.put(unit(1, 0, 0), "scope", "stored")
+
+    cache.clear()
+
+    assert cache.get(unit(1, 0, 0), "scope") is None
+    cache.put(unit(1, 0, 0), "scope", "again")
+    assert cache.get(unit(1, 0, 0), "scope") == "again"
+
+
+def test_exact_match_cache_evicts_least_recently_used():
+    cache = ExactMatchCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_classification_misses_are_not_cached_semantically(monkeypatch):
+    from backend.services import logic
+
+    monkeypatch.setattr(logic, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(logic, "embed_query", lambda text: unit(1, 0, 0))
+    responses = [
+        {"category": "Биллинг", "matched_template_id": None},
+        {"category": "Биллинг", "matched_template_id": 7},
+    ]
+    calls = []
+
+    def classify(text, query_vector=None):
+        calls.append(text)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    monkeypatch.setattr(logic, "classify_and_ner", classify)
+
+    assert logic._classify_uncached("счёт")["matched_template_id"] is None
+    assert logic._classify_uncached("счёт?")["matched_template_id"] == 7
+    assert logic._classify_uncached("мой счёт")["matched_template_id"] == 7
+    assert calls == ["счёт", "счёт?"]
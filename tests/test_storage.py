@@ -0,0 +1,199 @@
+import threading
+
+import pytest
+
+# Independent of the generated columns and the trigger: recomputes every
+# counter straight from the JSON payloads.
+DIRECT_EVENT_TOTALS_SQL = """
+    SELECT
+        kind,
+        COUNT(*),
+        TOTAL(
+            CASE kind
+                WHEN 'search' THEN json_extract(payload, '$.result_count') > 0
+                WHEN 'classify' THEN json_extract(payload, '$.confidence') >= 0.5
+                ELSE json_extract(payload, '$.useful') = 1
+            END
+        ),
+        TOTAL(latency_ms),
+        COUNT(latency_ms),
+        TOTAL(score),
+        COUNT(score)
+    FROM (
+        SELECT
+            kind,
+            latency_ms,
+            payload,
+            CASE kind
+                WHEN 'search' THEN json_extract(payload, '$.top_score')
+                WHEN 'classify' THEN json_extract(payload, '$.confidence')
+            END AS score
+        FROM events
+    )
+    WHERE kind IN ('search', 'classify', 'feedback')
+    GROUP BY kind
+    ORDER BY kind
+"""
+
+EVENT_COUNTERS_SQL = """
+    SELECT kind, total, success, latency_sum, latency_n, score_sum, score_n
+    FROM event_counters
+    ORDER BY kind
+"""
+
+LEGACY_EVENTS_SQL = """
+    CREATE TABLE events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        session_id TEXT,
+        user_agent TEXT,
+        latency_ms REAL,
+        payload TEXT,
+        extra TEXT
+    )
+"""
+
+SAMPLE_EVENTS = [
+    ("search", 10.0, {"result_count": 3, "top_score": 0.9}),
+    ("search", None, {"result_count": 0, "top_score": None}),
+    ("search", 5.0, {}),
+    ("classify", 20.0, {"confidence": 0.7}),
+    ("classify", None, {"confidence": 0.3}),
+    ("classify", 7.5, {}),
+    ("feedback", None, {"useful": True}),
+    ("feedback", 1.0, {"useful": False}),
+    ("feedback", None, {}),
+    ("spellcheck", 3.0, {"result_count": 5}),
+]
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    from backend import storage
+
+    storage.flush_now(timeout=None)
+    monkeypatch.setattr(storage, "STATS_DB_PATH", tmp_path / "stats.db")
+    monkeypatch.setattr(storage, "_local", threading.local())
+    yield storage
+    storage.flush_now(timeout=None)
+
+
+def _assert_counters_match_events(conn):
+    counters = conn.execute(EVENT_COUNTERS_SQL).fetchall()
+    expected = conn.execute(DIRECT_EVENT_TOTALS_SQL).fetchall()
+    assert [row[0] for row in counters] == ["classify", "feedback", "search"]
+    assert [tuple(row) for row in counters] == [
+        pytest.approx(tuple(row)) for row in expected
+    ]
+
+
+def test_event_counters_backfill_matches_existing_events(storage):
+    conn = storage._get_connection()
+    conn.execute(LEGACY_EVENTS_SQL)
+    conn.executemany(
+        "INSERT INTO events (kind, latency_ms, payload) VALUES (?, ?, ?)",
+        [
+            (kind, latency, storage._encode_json(payload))
+            for kind, latency, payload in SAMPLE_EVENTS
+        ],
+    )
+
+    storage.init_storage()
+
+    _assert_counters_match_events(conn)
+
+
+def test_event_counters_trigger_tracks_new_events(storage):
+    storage.init_storage()
+    conn = storage._get_connection()
+
+    for kind, latency, payload in SAMPLE_EVENTS * 2:
+        storage.log_event(kind, latency_ms=latency, payload=payload)
+    assert storage.flush_now(timeout=None)
+
+    _assert_counters_match_events(conn)
+    (total,) = conn.execute("SELECT SUM(total) FROM event_counters").fetchone()
+    assert total == 18
+
+
+VOTES = [
+    # (target, category, subcategory, votes, correct)
+    ("main", "Биллинг", "Счета", 2, 1),
+    ("main", "Аккаунт", "Вход", 2, 2),
+    ("main", "Доставка", "Сроки", 2, 0),
+    ("main", "", "Прочее", 3, 3),
+    ("main", None, None, 3, 0),
+    ("main", "Аккаунт", "Пароль", 1, 1),
+    ("sub", "Биллинг", "Счета", 1, 0),
+    ("sub", "Аккаунт", "Вход", 1, 1),
+    ("sub", "Биллинг", "", 4, 2),
+    ("sub", "Аккаунт", None, 2, 1),
+]
+
+
+@pytest.fixture
+def voted_storage(storage):
+    storage.init_storage()
+    rows = []
+    for target, category, subcategory, votes, correct in VOTES:
+        rows += [
+            (target, category, subcategory, int(n < correct)) for n in range(votes)
+        ]
+    storage._get_connection().executemany(
+        "INSERT INTO classification_votes (target, category, subcategory, is_correct)"
+        " VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    return storage
+
+
+def test_vote_pairs_order_by_total_then_nulls_first(voted_storage):
+    summary = voted_storage.fetch_summary(pair_limit=8)
+    pairs = summary["quality"]["classification"]["pairs"]
+
+    assert [(p["category"], p["subcategory"]) for p in pairs] == [
+        ("Биллинг", ""),
+        (None, None),
+        ("", "Прочее"),
+        ("Аккаунт", "Вход"),
+        ("Биллинг", "Счета"),
+        ("Аккаунт", None),
+        ("Доставка", "Сроки"),
+        ("Аккаунт", "Пароль"),
+    ]
+    assert pairs[3]["main"] == {"total": 2, "correct": 2, "accuracy": 1.0}
+    assert pairs[3]["sub"] == {"total": 1, "correct": 1, "accuracy": 1.0}
+
+    top = voted_storage.fetch_summary(pair_limit=3)["quality"]["classification"]
+    assert [(p["category"], p["subcategory"]) for p in top["pairs"]] == [
+        ("Биллинг", ""),
+        (None, None),
+        ("", "Прочее"),
+    ]
+    assert top["overall_main"]["total"] == 13
+    assert top["overall_sub"]["total"] == 8
+
+
+def test_category_stats_skip_blank_names_and_break_ties_by_name(voted_storage):
+    analytics = voted_storage.fetch_summary()["analytics"]
+
+    assert [
+        (c["category"], c["total"], c["correct"]) for c in analytics["categories"]
+    ] == [
+        ("Аккаунт", 3, 3),
+        ("Биллинг", 2, 1),
+        ("Доставка", 2, 0),
+    ]
+    assert [
+        (s["category"], s["subcategory"], s["total"])
+        for s in analytics["subcategories"]
+    ] == [
+        ("Аккаунт", "Вход", 1),
+        ("Биллинг", "Счета", 1),
+    ]
+    assert analytics["overview"]["operator"] == {
+        "total": 21,
+        "correct": 11,
+        "accuracy": pytest.approx(11 / 21),
+    }
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from backend.services.template_fetcher import TemplateFetcher
+
+
+class RecordingFetch:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, ids):
+        self.calls.append(sorted(ids))
+        if self.error is not None:
+            raise self.error
+        return {
+            record_id: f"record-{record_id}" for record_id in ids if record_id < 100
+        }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_one_fetch():
+    fetch = RecordingFetch()
+    fetcher = TemplateFetcher(fetch, max_delay=0.01)
+
+    results = await asyncio.gather(
+        fetcher.get(1), fetcher.get(2), fetcher.get(1), fetcher.get(404)
+    )
+
+    assert results == ["record-1", "record-2", "record-1", None]
+    assert fetch.calls == [[1, 2, 404]]
+
+
+@pytest.mark.asyncio
+async def test_max_batch_dispatches_without_waiting_for_the_delay():
+    fetch = RecordingFetch()
+    fetcher = TemplateFetcher(fetch, max_delay=30, max_batch=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(fetcher.get(1), fetcher.get(2)), timeout=5
+    )
+
+    assert results == ["record-1", "record-2"]
+    assert fetch.calls == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_ids_beyond_max_batch_go_into_the_next_batch():
+    fetch = RecordingFetch()
+    fetcher = TemplateFetcher(fetch, max_delay=0.01, max_batch=2)
+
+    results = await asyncio.gather(fetcher.get(1), fetcher.get(2), fetcher.get(3))
+
+    assert results == ["record-1", "record-2", "record-3"]
+    assert fetch.calls == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_fetch_error_reaches_every_waiter():
+    fetcher = TemplateFetcher(RecordingFetch(RuntimeError("db locked")), max_delay=0.01)
+
+    results = await asyncio.gather(
+        fetcher.get(1), fetcher.get(1), fetcher.get(2), return_exceptions=True
+    )
+
+    assert len(results) == 3
+    assert all(
+        isinstance(result, RuntimeError) and str(result) == "db locked"
+        for result in results
+    )
+
+
+def test_fetcher_recovers_after_its_event_loop_closes():
+    fetch = RecordingFetch()
+    fetcher = TemplateFetcher(fetch, max_delay=0.2)
+
+    # The first loop closes while its dispatch timer is still pending.
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(fetcher.get(1), timeout=0.01))
+
+    result = asyncio.run(asyncio.wait_for(fetcher.get(2), timeout=5))
+
+    assert result == "record-2"
+    assert fetch.calls == [[2]]